@@ -0,0 +1,256 @@
+"""
+Benchmark script untuk parse, clean, encode dan write stages
+
+Generates synthetic psb_member HTML exports (same shape as the admin
+panel's <table id='mytable'> export) and times each pipeline stage
+separately, plus the fused HTML → SQL pipeline. Results are written
+as JSON so runs can be compared.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --sizes 1000 10000 --repeat 3 --output bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from modules.html_parser import (
+    auto_fix_html, clean_dataframe, iter_table_rows, parse_html_from_file, parse_html_table
+)
+from modules.parallel import default_workers
+from modules.pipeline import iter_html_sql
+from modules.sql_generator_advance import (
+    VALID_COLUMNS, column_kind, enum_values, generate_sql_advanced,
+    get_column_type, save_sql
+)
+
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Cold start: statement run in a fresh interpreter
+STARTUP_STATEMENTS = {
+    'python': 'pass',
+    'import modules.batch': 'import modules.batch',
+    'import main': 'import main',
+}
+
+# Dependencies the batch/fused path should not load at startup
+HEAVY_MODULES = ('pandas', 'numpy', 'bs4', 'lxml')
+
+# Headers exactly as the admin panel export writes them (see test.py)
+EXPORT_HEADERS = [
+    'No', 'Jalur ppdb', 'Nomor pendaftaran', 'Jenjang Yg Dipilih ( RA-MI-MTs-MA)',
+    'Nama Lengkap', 'NISN ( Jenjang TK Boleh Di Kosongkan )',
+    'Status  ( Mondok / Pulang Pergi ) Khusus  MTs & MA ', 'Bahasa',
+    'Jenjang  ( RA-MI-MTs-MA)', 'NIK', 'Nomor KK',
+]
+
+# Free-text columns psb_member does not have
+UNKNOWN_HEADERS = ['Catatan Panitia', 'Ukuran Seragam', 'Info Dari', 'Keterangan Tambahan']
+
+NAMES = ["Wibisana Kautsarrazky", "Siti Nur'aini", "Muhammad Al-Fatih", "Dewi O'Brien",
+         "Ahmad \\ Fauzi", "Nur Hidayah", "Rizky  Pratama ", "Putri Ayu"]
+
+
+def build_headers():
+    """Export headers + one header per valid column + unknown + duplicate"""
+    headers = list(EXPORT_HEADERS)
+    for col in sorted(VALID_COLUMNS):
+        headers.append(col.replace('_', ' ').capitalize())
+    headers += UNKNOWN_HEADERS
+    headers += ['NAMA', 'Tanggal lahir']  # Duplicates after sanitizing
+    return headers
+
+
+def fake_value(header, rnd):
+    """Plausible cell text for a header, including the usual dirt"""
+    if header in UNKNOWN_HEADERS:
+        return rnd.choice(['', 'Lorem ipsum dolor sit amet', 'M', 'Brosur'])
+    if header in ('NIK', 'Nomor KK', 'Nik', 'Nomor kk'):
+        return "'35091%011d" % rnd.randrange(10 ** 11)  # Excel apostrophe
+
+    col_type = get_column_type(header)
+    kind = column_kind(col_type)
+    roll = rnd.random()
+    if roll < 0.15:
+        return ''
+    if kind == 'int':
+        return str(rnd.randrange(0, 200)) if roll > 0.2 else 'abc'
+    if kind == 'decimal':
+        return '%.2f' % rnd.uniform(50, 100)
+    if kind == 'date':
+        if roll < 0.3:
+            return rnd.choice(['0000-00-00', '0000-00-00 00:00:00'])
+        return '20%02d-%02d-%02d 08:15:00' % (rnd.randrange(5, 20), rnd.randrange(1, 13), rnd.randrange(1, 29))
+    if kind == 'enum':
+        values = sorted(enum_values(col_type))
+        return rnd.choice(values) if roll > 0.25 else 'invalid'
+    return rnd.choice(NAMES)
+
+
+def make_export(rows, seed=0):
+    """Synthetic export HTML with ~30% missing </tr> tags"""
+    rnd = random.Random(seed)
+    headers = build_headers()
+    out = ["<table id='mytable' width=\"100%\" border=\"1\">", "<tr>"]
+    out += [f"    <th>{h}</th>" for h in headers]
+    out.append("</tr>")
+    for i in range(1, rows + 1):
+        out.append("<tr>")
+        out.append(f"    <td>{i}</td>")
+        out += [f"    <td>{fake_value(h, rnd)}</td>" for h in headers[1:]]
+        if rnd.random() > 0.3:
+            out.append("</tr>")
+    out.append("</table>")
+    return '\n'.join(out)
+
+
+def timed(func, repeat):
+    """Best wall time of repeat runs, console output suppressed"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_size(rows, repeat, tmpdir, workers=1):
+    """Time every stage for one export size"""
+    html = make_export(rows)
+    html_bytes = len(html.encode('utf-8'))
+    results = []
+
+    def record(stage, seconds, **extra):
+        entry = {'stage': stage, 'rows': rows, 'seconds': round(seconds, 6),
+                 'rows_per_s': round(rows / seconds, 1) if seconds else None,
+                 'input_bytes': html_bytes}
+        entry.update(extra)
+        results.append(entry)
+        print(f"  {stage:28s} {seconds:9.3f}s  {entry['rows_per_s'] or 0:>12,.0f} rows/s")
+
+    seconds, fixed = timed(lambda: auto_fix_html(html), repeat)
+    record('auto_fix_html', seconds)
+
+    seconds, df = timed(lambda: parse_html_table(html, cache=False), repeat)
+    record('parse_html_table', seconds, backend=df.attrs.get('parser_backend'))
+
+    seconds, _ = timed(lambda: parse_html_table(html, streaming=True, cache=False), repeat)
+    record('parse_html_table[stream]', seconds, backend='stream')
+
+    # From disk: mmap reader, then split into row ranges over worker processes
+    html_file = os.path.join(tmpdir, f'bench_{rows}.html')
+    with open(html_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    seconds, _ = timed(lambda: parse_html_from_file(html_file, cache=False), repeat)
+    record('parse_html_from_file', seconds)
+    if workers > 1:
+        seconds, _ = timed(lambda: parse_html_from_file(html_file, cache=False, workers=workers), repeat)
+        record(f'parse_html_from_file[workers={workers}]', seconds, workers=workers)
+
+    # Cleaning on its own, from the raw extracted strings
+    rows_iter = iter_table_rows([fixed])
+    headers = next(rows_iter)
+    raw = pd.DataFrame([r + [''] * (len(headers) - len(r)) for r in rows_iter if r], columns=headers)
+    seconds, _ = timed(lambda: clean_dataframe(raw.copy()), repeat)
+    record('clean_dataframe', seconds)
+
+    df.insert(0, 'subdomain', 'sekolah123')
+    seconds, sql = timed(lambda: generate_sql_advanced(df), repeat)
+    record('generate_sql_advanced', seconds, statements=len(sql['inserts']))
+
+    outfile = os.path.join(tmpdir, f'bench_{rows}.sql')
+    seconds, _ = timed(lambda: save_sql(sql, outfile), repeat)
+    record('save_sql', seconds, output_bytes=os.path.getsize(outfile))
+
+    # Fused HTML → SQL path (no DataFrame), parse + encode together
+    seconds, _ = timed(lambda: sum(1 for _ in iter_html_sql([html], subdomain='sekolah123')), repeat)
+    record('iter_html_sql[fused]', seconds)
+    seconds, _ = timed(lambda: sum(1 for _ in iter_html_sql([html], subdomain='sekolah123', streaming=True)),
+                       repeat)
+    record('iter_html_sql[fused,stream]', seconds, backend='stream')
+
+    return results
+
+
+def bench_startup(repeat):
+    """Best wall time of a fresh interpreter running each startup statement"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for name, stmt in STARTUP_STATEMENTS.items():
+        best = None
+        for _ in range(max(repeat, 3)):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', stmt], cwd=here, check=True)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        
+        probe = f"{stmt}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        loaded = subprocess.run([sys.executable, '-c', probe], cwd=here, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        results.append({'stage': f'startup[{name}]', 'seconds': round(best, 6),
+                        'heavy_modules': loaded.split(',') if loaded else []})
+        print(f"  {name:28s} {best * 1000:8.1f}ms  heavy: {loaded or '-'}")
+    return results
+
+
+def git_revision():
+    """Short commit hash of the checkout, if any"""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HTML → SQL pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage, best time is kept")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help="processes for the parallel file parse (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    report = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'columns': len(build_headers()),
+        'repeat': args.repeat,
+        'results': [],
+    }
+
+    print("\n🚀 Cold start")
+    report['startup'] = bench_startup(args.repeat)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for rows in args.sizes:
+            print(f"\n📊 {rows:,} rows × {report['columns']} columns")
+            report['results'] += bench_size(rows, args.repeat, tmpdir, args.workers)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,13 +2,18 @@
 HTML Table Fixer
 Memperbaiki HTML table yang missing </tr> tags
 """
-import re
+import io
+import os
 import sys
+import tempfile
+
+from modules.html_parser import STREAM_CHUNK_SIZE, read_chunks
+from modules.html_repair import HTMLRepairer, iter_repaired
 
 
 def fix_html_table(html_content):
     """
-    Fix malformed HTML table by adding missing </tr> tags
+    Fix malformed HTML table by adding missing </tr>, </td> and </th> tags
     
     Args:
         html_content (str): Raw HTML content
@@ -18,109 +23,147 @@ def fix_html_table(html_content):
     """
     print("🔧 Fixing HTML table...")
     
-    # Split by lines
-    lines = html_content.split('\n')
-    fixed_lines = []
+    # One pass over the markup, tags are counted while repairing
+    repairer = HTMLRepairer()
+    fixed_html = repairer.feed(html_content) + repairer.close()
     
-    inside_tr = False
+    print_stats(repairer.stats)
     
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        
-        # Check if opening <tr>
-        if stripped.startswith('<tr'):
-            # If we were already inside a <tr>, close it first
-            if inside_tr:
-                fixed_lines.append('</tr>')
-            
-            fixed_lines.append(line)
-            inside_tr = True
-        
-        # Check if closing </tr>
-        elif '</tr>' in stripped:
-            fixed_lines.append(line)
-            inside_tr = False
-        
-        # Check if it's a table tag or other non-data tag
-        elif stripped.startswith('<table') or stripped.startswith('</table>'):
-            # Close any open <tr> before table end
-            if inside_tr and stripped.startswith('</table>'):
-                fixed_lines.append('</tr>')
-                inside_tr = False
-            fixed_lines.append(line)
-        
-        # Regular content (th, td, etc)
-        else:
-            fixed_lines.append(line)
-    
-    # Close final <tr> if still open
-    if inside_tr:
-        fixed_lines.append('</tr>')
+    return fixed_html
+
+
+def print_stats(stats, file=None):
+    """
+    Print repair statistics
     
-    fixed_html = '\n'.join(fixed_lines)
+    Args:
+        stats (dict): HTMLRepairer.stats
+        file: Stream to print to (default: stdout)
+    """
+    print(f"📊 Statistics:", file=file)
+    print(f"   Original <tr>: {stats['tr']}", file=file)
+    print(f"   Original </tr>: {stats['/tr']}", file=file)
+    print(f"   Fixed </tr>: {stats['/tr'] + stats['added_tr']}", file=file)
+    print(f"   ✅ Added {stats['added_tr']} closing tags", file=file)
+    if stats['added_td'] or stats['added_th']:
+        print(f"   ✅ Added {stats['added_td']} </td> and {stats['added_th']} </th>", file=file)
+
+
+def fix_html_stream(src, dst, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Fix HTML from one open text stream into another, chunk by chunk
     
-    # Count fixes
-    original_tr_count = html_content.count('<tr')
-    original_close_count = html_content.count('</tr>')
-    fixed_close_count = fixed_html.count('</tr>')
+    Memory stays at about one chunk, whatever the size of the export.
     
-    added = fixed_close_count - original_close_count
+    Args:
+        src: Readable text stream
+        dst: Writable text stream
+        chunk_size (int): Characters read per block
     
-    print(f"📊 Statistics:")
-    print(f"   Original <tr>: {original_tr_count}")
-    print(f"   Original </tr>: {original_close_count}")
-    print(f"   Fixed </tr>: {fixed_close_count}")
-    print(f"   ✅ Added {added} closing tags")
+    Returns:
+        dict: HTMLRepairer.stats
+    """
+    repairer = HTMLRepairer()
+    for piece in iter_repaired(read_chunks(src, chunk_size), repairer):
+        dst.write(piece)
+    return repairer.stats
+
+
+def _open_text(path, mode):
+    """Open a file, or stdin/stdout for '-', without newline translation
     
-    return fixed_html
+    Undecodable bytes are carried through unchanged (surrogateescape),
+    so non-UTF-8 exports are repaired byte for byte.
+    """
+    if path == '-':
+        stream = sys.stdin.buffer if mode == 'r' else sys.stdout.buffer
+        return io.TextIOWrapper(stream, encoding='utf-8', errors='surrogateescape',
+                                newline='', write_through=True)
+    return open(path, mode, encoding='utf-8', errors='surrogateescape', newline='')
 
 
-def fix_html_from_file(input_file, output_file=None):
+def fix_html_from_file(input_file, output_file=None, chunk_size=STREAM_CHUNK_SIZE):
     """
-    Fix HTML from file
+    Fix HTML from file, streaming (constant memory)
     
     Args:
-        input_file (str): Input HTML file path
-        output_file (str): Output file path (optional)
+        input_file (str): Input HTML file path, '-' for stdin
+        output_file (str): Output file path (optional), '-' for stdout.
+            Defaults to <stem>_fixed<ext>, or stdout when reading stdin.
+            A file is written to a temporary name and moved into place at
+            the end, so fixing a file onto itself never truncates it
+        chunk_size (int): Characters read per block
+    
+    Returns:
+        str or None: Output file path
     """
+    if not output_file:
+        if input_file == '-':
+            output_file = '-'
+        else:
+            stem, ext = os.path.splitext(input_file)
+            output_file = f"{stem}_fixed{ext or '.html'}"
+    
+    # Keep stdout clean for the HTML when it is part of a pipeline
+    log = sys.stderr if output_file == '-' else sys.stdout
+    
+    src = dst = tmp = None
     try:
-        # Read input
-        with open(input_file, 'r', encoding='utf-8') as f:
-            html = f.read()
-        
-        print(f"📖 Reading: {input_file}")
-        
-        # Fix
-        fixed = fix_html_table(html)
+        src = _open_text(input_file, 'r')
+        if output_file == '-':
+            dst = _open_text(output_file, 'w')
+        else:
+            fd, tmp = tempfile.mkstemp(prefix='.fix-', suffix='.tmp',
+                                       dir=os.path.dirname(os.path.abspath(output_file)))
+            os.close(fd)
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)  # mkstemp creates 0600, use normal file mode
+            dst = _open_text(tmp, 'w')
         
-        # Determine output file
-        if not output_file:
-            output_file = input_file.replace('.html', '_fixed.html')
+        print(f"📖 Reading: {'stdin' if input_file == '-' else input_file}", file=log)
+        print("🔧 Fixing HTML table...", file=log)
         
-        # Save
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(fixed)
+        stats = fix_html_stream(src, dst, chunk_size)
+        dst.flush()
+        if tmp:
+            dst.close()
+            os.replace(tmp, output_file)
+            tmp = None
         
-        print(f"✅ Saved to: {output_file}")
+        print_stats(stats, file=log)
+        print(f"✅ Saved to: {'stdout' if output_file == '-' else output_file}", file=log)
         return output_file
         
     except Exception as e:
-        print(f"❌ Error: {e}")
+        print(f"❌ Error: {e}", file=log)
         return None
+    
+    finally:
+        # Detach instead of closing so sys.stdin/sys.stdout stay usable
+        for stream, path in ((src, input_file), (dst, output_file)):
+            if stream is not None and not stream.closed:
+                if path == '-':
+                    stream.detach()
+                else:
+                    stream.close()
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)  # Failed run: leave the output untouched
 
 
 def main():
     """Main function"""
-    print("\n" + "="*60)
-    print("  HTML TABLE FIXER")
-    print("="*60)
-    
     if len(sys.argv) > 1:
-        # Command line mode
+        # Command line mode: python fix.py INPUT [OUTPUT], '-' = stdin/stdout
         input_file = sys.argv[1]
         output_file = sys.argv[2] if len(sys.argv) > 2 else None
-        fix_html_from_file(input_file, output_file)
+        ok = fix_html_from_file(input_file, output_file)
+        sys.exit(0 if ok else 1)
     else:
+        print("\n" + "="*60)
+        print("  HTML TABLE FIXER")
+        print("="*60)
+        
         # Interactive mode
         print("\nOptions:")
         print("1. Fix from file")
@@ -1,6 +1,14 @@
+import argparse
+import sys
 
+from modules.batch import collect_jobs, run_batch
+from modules.dedup import DEDUP_KEYS, dedupe_dataframe
+from modules.delta import DEFAULT_DELTA_KEY, DELTA_MODES
 from modules.html_parser import input_html, parse_html_table
-from modules.sql_generator_advance import generate_sql_advanced, save_sql
+from modules.sql_generator_advance import iter_sql_advanced, save_sql_stream, select_valid_columns
+
+# Rows packed into each extended INSERT statement
+ROWS_PER_INSERT = 500
 
 
 def main():
@@ -26,7 +34,7 @@ def main():
     
     # 3. Parse
     print("\n📋 Parsing HTML...")
-    df = parse_html_table(html)
+    df = parse_html_table(html, columns=select_valid_columns)
     
     if df is None or df.empty:
         print("❌ Parse failed")
@@ -34,6 +42,20 @@ def main():
     
     print(f"✅ Success: {len(df)} rows × {len(df.columns)} columns")
     
+    # 3b. Optional: collapse registrants who submitted twice
+    key = input(f"\n🧹 Dedup key ({' / '.join(DEDUP_KEYS)}, Enter = skip): ").strip().lower()
+    if key:
+        if key not in DEDUP_KEYS:
+            print(f"❌ Unknown dedup key: {key}")
+            return
+        policy = input("Keep which row? (first / last / complete, default: complete): ").strip().lower() or 'complete'
+        try:
+            df = dedupe_dataframe(df, key, policy)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print(f"✅ {len(df)} rows left")
+    
     # 4. Add subdomain column to DataFrame
     print(f"\n🔧 Adding subdomain '{subdomain}' to all rows...")
     df.insert(0, 'subdomain', subdomain)
@@ -49,31 +71,26 @@ def main():
         print("❌ Cancelled")
         return
     
-    # 7. Generate INSERT statements only
-    print("\n🔧 Generating INSERT statements...")
-    table = "psb_member"  # Fixed table name
-    sql_dict = generate_sql_advanced(df, table_name=table)
-    
-    # 8. Extract only INSERT statements (no CREATE TABLE)
-    insert_only = {
-        'inserts': sql_dict['inserts'],
-        'full_sql': '\n'.join(sql_dict['inserts'])
-    }
-    
-    print(f"✅ Generated {len(sql_dict['inserts'])} INSERT statements")
-    
-    # 9. Save
+    # 7. Output file
     outfile = input("\nOutput file (default: insert_psb_member.sql): ").strip() or "insert_psb_member.sql"
     
     if not outfile.endswith('.sql'):
         outfile += '.sql'
     
-    if save_sql(insert_only, outfile):
+    # 8. Generate INSERT statements only (no CREATE TABLE), streamed to disk
+    print("\n🔧 Generating INSERT statements...")
+    table = "psb_member"  # Fixed table name
+    statements = iter_sql_advanced(df, table_name=table, rows_per_insert=ROWS_PER_INSERT,
+                                   include_create=False)
+    
+    # 9. Save
+    stats = save_sql_stream(statements, outfile)
+    if stats:
         print(f"\n{'='*60}")
         print(f"🎉 SUCCESS!")
         print(f"{'='*60}")
         print(f"📊 Total rows: {len(df)}")
-        print(f"📝 INSERT statements: {len(sql_dict['inserts'])}")
+        print(f"📝 INSERT statements: {stats['statements']}")
         print(f"💾 File saved: {outfile}")
         print(f"🏷️  Subdomain: {subdomain}")
         print(f"{'='*60}")
@@ -81,5 +98,56 @@ def main():
         print("\n❌ Save failed")
 
 
+def batch_main(argv=None):
+    """Non-interactive entry point: python main.py --batch DIR_OR_MANIFEST"""
+    parser = argparse.ArgumentParser(description="HTML to SQL generator")
+    parser.add_argument('--batch', metavar='SOURCE', required=True,
+                        help="directory of <subdomain>.html files, or CSV manifest of subdomain,html_file")
+    parser.add_argument('--out-dir', default='output', help="output directory (default: output)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--rows-per-insert', type=int, default=None,
+                        help=f"rows per INSERT statement (default: {ROWS_PER_INSERT})")
+    parser.add_argument('--fast-import', action='store_true',
+                        help="wrap each file in DISABLE KEYS / checks off / batched COMMIT")
+    parser.add_argument('--sink', metavar='URL', default=None,
+                        help="insert into a database instead of writing .sql files "
+                             "(sqlite:///psb.db or mysql://user:pw@host/db)")
+    parser.add_argument('--delta', action='store_true',
+                        help="only write rows that are new or changed since the previous run")
+    parser.add_argument('--delta-key', default=','.join(DEFAULT_DELTA_KEY),
+                        help=f"natural key columns for --delta (default: {','.join(DEFAULT_DELTA_KEY)})")
+    parser.add_argument('--delta-mode', choices=DELTA_MODES, default='update',
+                        help="changed rows as UPDATE, or INSERT ... ON DUPLICATE KEY UPDATE (upsert)")
+    args = parser.parse_args(argv)
+    
+    # Options the chosen output mode has no use for are an error, not a no-op
+    if args.sink:
+        unused = [flag for flag, given in (('--delta', args.delta), ('--fast-import', args.fast_import),
+                                           ('--rows-per-insert', args.rows_per_insert is not None))
+                  if given]
+        if unused:
+            parser.error(f"--sink inserts rows directly and can't be combined with {', '.join(unused)}")
+    elif args.delta and args.fast_import:
+        parser.error("--fast-import can't be combined with --delta")
+    rows_per_insert = ROWS_PER_INSERT if args.rows_per_insert is None else args.rows_per_insert
+    
+    delta = None
+    if args.delta:
+        delta = {'key': tuple(k.strip() for k in args.delta_key.split(',') if k.strip()),
+                 'mode': args.delta_mode}
+    
+    jobs = collect_jobs(args.batch)
+    if not jobs:
+        print(f"❌ No HTML exports found in {args.batch}")
+        return 1
+    
+    results = run_batch(jobs, args.out_dir, workers=args.workers,
+                        rows_per_insert=rows_per_insert, fast_import=args.fast_import,
+                        sink=args.sink, delta=delta)
+    return 0 if all(r['ok'] for r in results) else 1
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(batch_main())
     main()
\ No newline at end of file
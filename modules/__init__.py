@@ -1,11 +1,19 @@
 """
 Modules package untuk HTML to SQL Converter
+
+Public names are imported on first access (PEP 562), so ``import modules``
+or ``import modules.batch`` does not load pandas, NumPy or BeautifulSoup.
 """
+from importlib import import_module
 
-from .html_parser import input_html, parse_html_table
-from .preview import preview_data
-from .sql_generator import generate_sql
-from .output import output_sql
+# name -> submodule that defines it
+_EXPORTS = {
+    'input_html': 'html_parser',
+    'parse_html_table': 'html_parser',
+    'preview_data': 'preview',
+    'generate_sql': 'sql_generator',
+    'output_sql': 'output',
+}
 
 __all__ = [
     'input_html',
@@ -13,4 +21,16 @@ __all__ = [
     'preview_data',
     'generate_sql',
     'output_sql'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+        globals()[name] = value  # Cache: later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,170 @@
+"""
+Batch Module
+Convert many (subdomain, HTML export) pairs without prompts
+"""
+import contextlib
+import csv
+import glob
+import io
+import os
+import time
+
+from .db_sink import close_connections, get_connection, sink_html_file
+from .delta import convert_delta_file
+from .parallel import default_workers, imap_ordered
+from .pipeline import convert_html_file
+
+
+HTML_PATTERNS = ('*.html', '*.htm')
+
+
+def collect_jobs(source):
+    """Build (subdomain, html_file) pairs from a directory or manifest
+    
+    A directory yields one job per ``*.html``/``*.htm`` file, using the
+    file name without extension as subdomain. Anything else is read as a
+    CSV manifest of ``subdomain,html_file`` lines; relative paths are
+    resolved against the manifest's folder and lines starting with ``#``
+    are ignored.
+    
+    Args:
+        source (str): Directory or manifest path
+        
+    Returns:
+        list: [(subdomain, html_file), ...]
+    """
+    if os.path.isdir(source):
+        files = sorted(f for p in HTML_PATTERNS for f in glob.glob(os.path.join(source, p)))
+        return [(os.path.splitext(os.path.basename(f))[0], f) for f in files]
+    
+    base = os.path.dirname(os.path.abspath(source))
+    jobs = []
+    with open(source, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip().startswith('#'):
+                continue
+            if len(row) < 2:
+                raise ValueError(f"Manifest line needs 'subdomain,html_file': {row}")
+            subdomain, path = row[0].strip(), row[1].strip()
+            jobs.append((subdomain, os.path.join(base, path)))
+    return jobs
+
+
+def convert_file(job, output_dir, rows_per_insert=1, fast_import=False, sink=None, delta=None):
+    """Parse → add subdomain → generate → save for one export, without pandas
+    
+    Console output of the individual steps is captured so parallel
+    workers do not interleave; the caller prints one line per file.
+    With a ``sink`` URL the rows are inserted into that database instead
+    of written to a .sql file, over one connection per worker process.
+    With ``delta`` options (see delta.iter_delta_sql) only rows new or
+    changed since the previous run are written, tracked in
+    ``<output_dir>/.delta/<subdomain>.idx``.
+    
+    Returns:
+        dict: Per-file result and statistics
+    """
+    subdomain, html_file = job
+    outfile = sink or os.path.join(output_dir, f"insert_{subdomain}.sql")
+    result = {
+        'subdomain': subdomain, 'input': html_file, 'output': outfile,
+        'ok': False, 'rows': 0, 'statements': 0, 'bytes_in': 0, 'bytes_out': 0,
+        'seconds': 0.0, 'error': None,
+    }
+    start = time.perf_counter()
+    try:
+        result['bytes_in'] = os.path.getsize(html_file)
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            if sink:
+                backend, conn = get_connection(sink)
+                stats = sink_html_file(html_file, conn, backend, subdomain=subdomain)
+            elif delta is not None:
+                index_dir = os.path.join(output_dir, '.delta')
+                os.makedirs(index_dir, exist_ok=True)
+                stats = convert_delta_file(html_file, outfile, os.path.join(index_dir, f"{subdomain}.idx"),
+                                           subdomain=subdomain, rows_per_insert=rows_per_insert, **delta)
+            else:
+                # Fused HTML → SQL path, no DataFrame
+                stats = convert_html_file(html_file, outfile, subdomain=subdomain,
+                                          rows_per_insert=rows_per_insert, include_create=False,
+                                          fast_import=fast_import)
+        
+        if not stats or not stats.get('rows'):
+            # Last captured error line, e.g. a database constraint violation
+            errors = [line for line in log.getvalue().splitlines() if line.startswith('❌')]
+            result['error'] = errors[-1][1:].strip() if errors else 'parse failed'
+            return result
+        
+        result.update(ok=True, rows=stats['rows'], statements=stats.get('statements', 0),
+                      bytes_out=stats.get('bytes', 0))
+        return result
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+    finally:
+        result['seconds'] = time.perf_counter() - start
+
+
+def run_batch(jobs, output_dir='output', workers=None, rows_per_insert=1, fast_import=False,
+              sink=None, delta=None):
+    """Convert every job, files spread across a worker pool
+    
+    Args:
+        jobs (list): (subdomain, html_file) pairs, see collect_jobs
+        output_dir (str): Directory for the generated .sql files
+        workers (int): Worker processes (default: CPU count)
+        rows_per_insert (int): Rows per INSERT statement
+        fast_import (bool): Wrap each file in import tuning (deferred
+            keys, checks off, batched COMMITs)
+        sink (str): Database URL to insert into instead of writing .sql
+            files, see db_sink.parse_sink_url
+        delta (dict): Write only new/changed rows, options for
+            delta.iter_delta_sql (e.g. {'key': ('subdomain', 'nik')})
+        
+    Returns:
+        list: Per-file result dicts, in job order
+    """
+    if sink and (delta is not None or fast_import):
+        raise ValueError("A database sink can't be combined with delta or fast-import output")
+    if delta is not None and fast_import:
+        raise ValueError("Delta output can't be combined with fast-import")
+    
+    workers = min(workers or default_workers(), max(len(jobs), 1))
+    os.makedirs(output_dir, exist_ok=True)
+    
+    print(f"\n📦 Batch: {len(jobs)} files, {workers} workers → {sink or output_dir}")
+    start = time.perf_counter()
+    
+    args = (output_dir, rows_per_insert, fast_import, sink, delta)
+    if workers > 1:
+        results_iter = imap_ordered(convert_file, jobs, workers, args=args)
+    else:
+        results_iter = (convert_file(job, *args) for job in jobs)
+    
+    results = []
+    for r in results_iter:
+        results.append(r)
+        if r['ok']:
+            print(f"  ✅ {r['subdomain']}: {r['rows']} rows → {r['output']} ({r['seconds']:.2f}s)")
+        else:
+            print(f"  ❌ {r['subdomain']}: {r['input']} - {r['error']}")
+    
+    close_connections()
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print_summary(results, elapsed)
+    return results
+
+
+def print_summary(results, elapsed):
+    """Print batch totals and throughput"""
+    ok = [r for r in results if r['ok']]
+    rows = sum(r['rows'] for r in ok)
+    mb_in = sum(r['bytes_in'] for r in results) / (1024 * 1024)
+    mb_out = sum(r['bytes_out'] for r in ok) / (1024 * 1024)
+    
+    print(f"\n{'='*60}")
+    print(f"📊 Files: {len(ok)}/{len(results)} converted in {elapsed:.2f}s")
+    print(f"📝 Rows: {rows:,}  |  Input: {mb_in:.2f} MB  |  Output: {mb_out:.2f} MB")
+    print(f"⚡ {len(results) / elapsed:.2f} files/s  |  {rows / elapsed:,.0f} rows/s  |  {mb_in / elapsed:.2f} MB/s")
+    print(f"{'='*60}")
@@ -0,0 +1,130 @@
+"""
+Dedup Module
+Collapse registrants that appear more than once in one export
+
+Rows are grouped by a hash of their key (pandas hash tables, linear in
+the row count), never compared pairwise. Rows whose key is empty are
+left alone.
+"""
+from .sql_generator_advance import sanitize_column_name
+
+
+# Key presets: sanitized column names, None = hash of the whole row
+DEDUP_KEYS = {
+    'nik': ('nik',),
+    'nomor_kk+nama': ('nomor_kk', 'nama'),
+    'nomor_pendaftaran': ('nomor_pendaftaran',),
+    'row': None,
+}
+
+# Columns left out of the full-row hash: `no` is the export's row
+# counter and differs on every row (see delta.DEFAULT_DELTA_IGNORE)
+ROW_HASH_IGNORE = ('no',)
+
+# first / last occurrence, or the row with the most filled-in cells
+DEDUP_POLICIES = ('first', 'last', 'complete')
+
+# Collapsed rows listed in the console report
+REPORT_LIMIT = 10
+
+
+def _key_columns(df, names):
+    """Position of the first DataFrame column matching each sanitized key name"""
+    lookup = {}
+    for i, col in enumerate(df.columns):
+        lookup.setdefault(sanitize_column_name(col), i)
+    missing = [n for n in names if n not in lookup]
+    if missing:
+        raise ValueError(f"Key column(s) not in data: {', '.join(missing)}")
+    return [lookup[n] for n in names]
+
+
+def _normalized(col):
+    """Key text: trimmed, inner whitespace collapsed, case-folded; None if empty"""
+    s = col.astype('string').str.strip().str.replace(r'\s+', ' ', regex=True).str.casefold()
+    return s.mask(s == '')
+
+
+def dedupe_dataframe(df, key='nik', policy='first'):
+    """Drop duplicate registrants from a parsed export
+
+    Args:
+        df (pd.DataFrame): Parsed data
+        key (str): Preset from DEDUP_KEYS: 'nik', 'nomor_kk+nama',
+            'nomor_pendaftaran' or 'row' (hash of all columns but
+            ROW_HASH_IGNORE)
+        policy (str): 'first', 'last' or 'complete' (most non-empty
+            cells; ties keep the earlier row)
+
+    Returns:
+        pd.DataFrame: Deduplicated rows in original order. The report is
+        stored in ``df.attrs['dedup']``: key, policy, collapsed count,
+        groups and (row, kept row, key) triples (1-based positions in df)
+    """
+    import pandas as pd
+
+    if key not in DEDUP_KEYS:
+        raise ValueError(f"Unknown dedup key '{key}', expected one of {', '.join(DEDUP_KEYS)}")
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"Unknown dedup policy '{policy}', expected one of {', '.join(DEDUP_POLICIES)}")
+
+    names = DEDUP_KEYS[key]
+    positions = pd.RangeIndex(len(df))
+    if names is None:
+        hashed = [i for i, col in enumerate(df.columns) if sanitize_column_name(col) not in ROW_HASH_IGNORE]
+        keys = pd.DataFrame({'row': pd.util.hash_pandas_object(df.iloc[:, hashed], index=False).to_numpy()})
+        keyed = pd.Series(True, index=positions)
+    else:
+        cols = _key_columns(df, names)
+        keys = pd.DataFrame({i: _normalized(df.iloc[:, c].reset_index(drop=True)) for i, c in enumerate(cols)})
+        keyed = keys.notna().all(axis=1)
+
+    # One group id per distinct key (hash table, linear)
+    group = pd.Series(-1, index=positions)
+    group[keyed] = keys[keyed].groupby(list(keys.columns), sort=False).ngroup()
+
+    candidates = group[keyed]
+    if policy == 'complete':
+        filled = df.reset_index(drop=True).astype('string').apply(lambda c: c.str.strip().ne('')).fillna(False)
+        score = filled.sum(axis=1)[keyed]
+        kept = score.groupby(candidates, sort=False).idxmax()
+    else:
+        first = policy == 'first'
+        kept = candidates.index.to_series().groupby(candidates, sort=False).agg('first' if first else 'last')
+
+    keep = ~keyed
+    keep[kept.to_numpy()] = True
+    dropped = positions[~keep.to_numpy()]
+
+    # (row, kept row, key) for every dropped row, built column-wise
+    label = '+'.join(names) if names else 'row hash'
+    winners = group.iloc[dropped].map(kept).to_numpy()
+    if names is None:
+        values = [None] * len(dropped)
+    else:
+        parts = [df.iloc[dropped, c].astype(str).to_numpy() for c in cols]
+        values = [' / '.join(v) for v in zip(*parts)]
+    removed = list(zip((dropped + 1).tolist(), (winners + 1).tolist(), values))
+
+    result = df.iloc[keep.to_numpy()].copy()
+    result.attrs['dedup'] = {
+        'key': key, 'policy': policy, 'collapsed': len(removed),
+        'groups': int(group[dropped].nunique()) if len(removed) else 0,
+        'removed': removed,
+    }
+    _print_report(result.attrs['dedup'], label)
+    return result
+
+
+def _print_report(report, label):
+    """Console summary of a dedup run"""
+    if not report['collapsed']:
+        print(f"✅ No duplicate rows by {label}")
+        return
+    print(f"🧹 Collapsed {report['collapsed']} duplicate rows in {report['groups']} groups "
+          f"(key: {label}, keep: {report['policy']})")
+    for row, kept, value in report['removed'][:REPORT_LIMIT]:
+        detail = f" [{value}]" if value else ''
+        print(f"   - row {row} → kept row {kept}{detail}")
+    if report['collapsed'] > REPORT_LIMIT:
+        print(f"   ... and {report['collapsed'] - REPORT_LIMIT} more")
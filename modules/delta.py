@@ -0,0 +1,246 @@
+"""
+Delta Import Module
+Emit only the psb_member rows that are new or changed since the last run
+
+A fingerprint index (natural key → row hash) is kept on disk per export.
+Each run parses the whole export, but only new and changed rows are
+encoded and written: new rows as INSERTs, changed rows as UPDATE (or
+INSERT ... ON DUPLICATE KEY UPDATE) statements. The index is replaced
+once the .sql file has been written.
+
+Index file: 8-byte magic, then 16-byte records (8-byte BLAKE2b of the
+key, 8-byte BLAKE2b of the row).
+"""
+import hashlib
+import os
+
+from .html_parser import STREAM_CHUNK_SIZE, _report_encoding, iter_table_rows, make_cell_cleaner
+from .html_source import open_decoded
+from .sql_generator_advance import (
+    DEFAULT_MAX_ALLOWED_PACKET, ENCODE_CHUNK_ROWS, classify_columns, compile_column_encoders,
+    file_pieces, group_inserts, insert_prefix, resolve_columns, save_sql_stream
+)
+
+
+DEFAULT_DELTA_KEY = ('subdomain', 'nomor_pendaftaran')
+
+# Columns left out of the row hash and of UPDATEs: `no` is the export's
+# row counter and shifts whenever a registrant is removed
+DEFAULT_DELTA_IGNORE = ('no',)
+
+# Columns left out of INSERTs: the database assigns `no` (AUTO_INCREMENT
+# primary key); the export's counter would collide with rows of earlier runs
+DELTA_SKIP_COLUMNS = ('no',)
+
+DELTA_MODES = ('update', 'upsert')
+
+INDEX_MAGIC = b'PSBIDX1\n'
+_RECORD = 16
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+
+
+def load_index(path):
+    """Fingerprint index from a previous run ({} when there is none)"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    if not data.startswith(INDEX_MAGIC) or (len(data) - len(INDEX_MAGIC)) % _RECORD:
+        raise ValueError(f"Not a delta index file: {path}")
+    view = memoryview(data)[len(INDEX_MAGIC):]
+    return {bytes(view[i:i + 8]): bytes(view[i + 8:i + _RECORD])
+            for i in range(0, len(view), _RECORD)}
+
+
+def save_index(index, path):
+    """Write the fingerprint index atomically"""
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(b''.join(k + v for k, v in index.items()))
+    os.replace(tmp, path)
+
+
+def update_sql(table_name, cols, values, key_positions, set_positions):
+    """UPDATE statement for one changed row, matched on the key columns"""
+    sets = ', '.join(f"`{cols[i]}` = {values[i]}" for i in set_positions)
+    where = ' AND '.join(f"`{cols[i]}` = {values[i]}" for i in key_positions)
+    return f"UPDATE `{table_name}` SET {sets} WHERE {where};\n"
+
+
+def upsert_suffix(cols, set_positions):
+    """' ON DUPLICATE KEY UPDATE ...' clause for changed rows"""
+    return ' ON DUPLICATE KEY UPDATE ' + ', '.join(
+        f"`{cols[i]}` = VALUES(`{cols[i]}`)" for i in set_positions)
+
+
+def iter_delta_sql(chunks, index, subdomain=None, key=DEFAULT_DELTA_KEY, table_name="psb_member",
+                   rows_per_insert=1, max_statement_bytes=DEFAULT_MAX_ALLOWED_PACKET, mode='update',
+                   ignore=DEFAULT_DELTA_IGNORE, cleaning=None, new_index=None, stats=None):
+    """Yield SQL for the rows that differ from the previous run
+
+    Args:
+        chunks (iterable): HTML text pieces
+        index (dict): Fingerprints from the previous run (load_index)
+        subdomain (str): Injected `subdomain` column, as in main.py
+        key (tuple): Natural key columns (sanitized names)
+        mode (str): 'update' (UPDATE ... WHERE key) or 'upsert' (INSERT
+            ... ON DUPLICATE KEY UPDATE, needs a UNIQUE index on the key)
+        ignore (tuple): Columns excluded from the row hash and updates
+        new_index (dict): Receives the fingerprints of this run
+        stats (dict): Receives rows/new/changed/unchanged/removed/unkeyed/
+            duplicate
+        Others: See pipeline.iter_html_sql
+
+    Yields:
+        str: SQL pieces (INSERT / UPDATE statements)
+    """
+    if mode not in DELTA_MODES:
+        raise ValueError(f"Unknown delta mode '{mode}', expected one of {', '.join(DELTA_MODES)}")
+
+    offset = 1 if subdomain is not None else 0
+
+    def labels(headers):
+        return (['subdomain'] if offset else []) + list(headers)
+
+    def select(headers):
+        return [i - offset for i in classify_columns(labels(headers))[0] if i >= offset]
+
+    rows = iter_table_rows(chunks, select)
+    headers = next(rows, None)
+    if not headers:
+        print("❌ No table headers found in HTML")
+        return
+
+    _, cols, col_types = resolve_columns(labels(headers))
+    missing = [k for k in key if k not in cols]
+    if missing:
+        print(f"❌ Key column(s) not in export: {', '.join(missing)}")
+        return
+
+    key_positions = [cols.index(k) for k in key]
+    natural = [cols.index(k) for k in key if k != 'subdomain']
+    set_positions = [i for i, c in enumerate(cols) if c not in key and c not in ignore]
+    insert_positions = [i for i, c in enumerate(cols) if c not in DELTA_SKIP_COLUMNS]
+    hash_positions = [i for i, c in enumerate(cols) if c not in ignore]
+
+    encoders = compile_column_encoders(col_types)
+    clean = make_cell_cleaner(cleaning)
+    prefix = insert_prefix(table_name, [cols[i] for i in insert_positions])
+    suffix = upsert_suffix(cols, set_positions) if mode == 'upsert' else ''
+    lead = [subdomain] if offset else []
+
+    new_index = {} if new_index is None else new_index
+    counts = {'rows': 0, 'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0, 'unkeyed': 0,
+              'duplicate': 0}
+    seen = set()
+
+    def statements():
+        inserts = []
+        updates = []
+        for cells in rows:
+            if cells is None:
+                continue
+            cells = lead + [clean(c) for c in cells]
+            counts['rows'] += 1
+
+            # Hash the cleaned text; only new/changed rows get encoded
+            text = '\x1f'.join(['\x00' if cells[i] is None else cells[i] for i in hash_positions])
+            row_hash = _digest(text)
+            if natural and all(cells[i] is None for i in natural):
+                # No key value: the row itself is its identity
+                counts['unkeyed'] += 1
+                row_key = _digest('\x00row\x1f' + text)
+            else:
+                row_key = _digest('\x1f'.join(['\x00' if cells[i] is None else cells[i].strip()
+                                                for i in key_positions]))
+
+            # A key seen earlier in this export: keep the first row only,
+            # or the index would flip between the copies on every run
+            if row_key in seen:
+                counts['duplicate'] += 1
+                continue
+            seen.add(row_key)
+
+            previous = index.get(row_key)
+            new_index[row_key] = row_hash
+            if previous == row_hash:
+                counts['unchanged'] += 1
+                continue
+
+            values = [enc(c) for enc, c in zip(encoders, cells)]
+            if previous is None:
+                counts['new'] += 1
+                inserts.append('(' + ', '.join([values[i] for i in insert_positions]) + ')')
+            else:
+                counts['changed'] += 1
+                if suffix:
+                    row = ', '.join([values[i] for i in insert_positions])
+                    updates.append(f"{prefix}({row}){suffix};\n")
+                else:
+                    updates.append(update_sql(table_name, cols, values, key_positions, set_positions))
+
+            if len(inserts) + len(updates) >= ENCODE_CHUNK_ROWS:
+                yield from group_inserts(inserts, prefix, rows_per_insert, max_statement_bytes)[0]
+                yield from updates
+                inserts = []
+                updates = []
+
+        if inserts:
+            yield from group_inserts(inserts, prefix, rows_per_insert, max_statement_bytes)[0]
+        yield from updates
+
+        counts['removed'] = sum(1 for k in index if k not in new_index)
+        print(f"📊 Delta: {counts['new']} new, {counts['changed']} changed, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} no longer in export")
+        if counts['unkeyed']:
+            print(f"⚠️  {counts['unkeyed']} rows have no {'/'.join(key)} value, matched on full content")
+        if counts['duplicate']:
+            print(f"⚠️  {counts['duplicate']} rows repeat an earlier {'/'.join(key)}, kept the first")
+        if stats is not None:
+            stats.update(counts)
+
+    yield from file_pieces(None, statements())
+
+
+def convert_delta_file(html_file, outfile, index_file, subdomain=None,
+                       chunk_size=STREAM_CHUNK_SIZE, **options):
+    """Write the delta of an export to a .sql file and update its index
+
+    Args:
+        html_file (str): Input export
+        outfile (str): Output .sql file
+        index_file (str): Fingerprint index, read and then replaced
+        subdomain (str): Injected subdomain
+        **options: Passed to iter_delta_sql (key, mode, ...)
+
+    Returns:
+        dict or None: Delta counts plus 'statements' and 'bytes'
+    """
+    stats = {}
+    new_index = {}
+    try:
+        index = load_index(index_file)
+        with open_decoded(html_file, chunk_size) as (chunks, encoding):
+            _report_encoding(encoding)
+            pieces = iter_delta_sql(chunks, index, subdomain=subdomain,
+                                    new_index=new_index, stats=stats, **options)
+            saved = save_sql_stream(pieces, outfile)
+    except Exception as e:
+        print(f"❌ Error generating delta: {e}")
+        return None
+
+    if not saved:
+        return None
+    if not stats:
+        os.remove(outfile)  # No usable table, don't leave an empty file
+        return None
+
+    # Only remember this run once its SQL is safely on disk
+    save_index(new_index, index_file)
+    stats.update(saved)
+    return stats
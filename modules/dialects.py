@@ -0,0 +1,228 @@
+"""
+SQL Dialects Module
+Emit psb_member data for MySQL, PostgreSQL and SQLite
+
+Column types and value normalization come from sql_generator_advance
+(COLUMN_TYPES, compile_text_encoder); each dialect only changes quoting,
+type names and the bulk-load idiom:
+
+- mysql:      extended INSERT statements (same text as iter_sql_advanced)
+- postgresql: one COPY ... FROM STDIN block in text format (psql script)
+- sqlite:     multi-row INSERT statements inside a single transaction
+"""
+import re
+from datetime import date
+from functools import lru_cache
+
+from .sql_generator_advance import (
+    DEFAULT_MAX_ALLOWED_PACKET, ENCODE_CHUNK_ROWS, _resolve_columns, column_kind,
+    compile_text_encoder, enum_values, file_pieces, group_inserts, iter_sql_advanced
+)
+
+
+DIALECTS = ('mysql', 'postgresql', 'sqlite')
+
+# SQLite's default SQLITE_MAX_SQL_LENGTH
+SQLITE_MAX_STATEMENT_BYTES = 1000000
+
+# PostgreSQL COPY text format escapes (NULL is \N)
+_COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+# Columns left out of COPY and SQLite INSERTs: `no` is the SERIAL /
+# INTEGER PRIMARY KEY, the database numbers the rows. The export's own
+# counter would collide across schools and leave the sequence at 1
+DIALECT_SKIP_COLUMNS = ('no',)
+
+
+def quote_identifier(name):
+    """"name" for PostgreSQL and SQLite"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def translate_type(col, col_type, dialect):
+    """MySQL column type from COLUMN_TYPES → column definition for a dialect
+
+    PostgreSQL has no zero date, so DATE/DATETIME columns become nullable
+    there and '0000-00-00' is loaded as NULL. Wide integers (INT(10) and
+    up, e.g. phone numbers) become BIGINT there, PostgreSQL INTEGER is
+    32-bit. ENUMs become text columns with a CHECK constraint in both
+    PostgreSQL and SQLite.
+
+    Args:
+        col (str): Column name (for the ENUM CHECK constraint)
+        col_type (str): MySQL type, e.g. "VARCHAR(75) NOT NULL DEFAULT ''"
+        dialect (str): 'postgresql' or 'sqlite'
+
+    Returns:
+        str: Column type and constraints
+    """
+    base, args, rest = re.match(r"(\w+)(\([^)]*\))?(.*)", col_type).groups()
+    args = args or ''
+    kind = column_kind(col_type)
+    sqlite = dialect == 'sqlite'
+
+    if kind == 'int':
+        if sqlite:
+            return 'INTEGER' + rest  # Always 64-bit in SQLite
+        width = int(args[1:-1]) if args[1:-1].isdigit() else 0
+        return ('BIGINT' if base == 'BIGINT' or width >= 10 else 'INTEGER') + rest
+    if kind == 'decimal':
+        return 'NUMERIC' + args + rest
+    if kind == 'date':
+        if sqlite:
+            return 'TEXT' + rest
+        return ('TIMESTAMP' if base == 'DATETIME' else 'DATE') + ' NULL'
+    if kind == 'enum':
+        values = sorted(enum_values(col_type))
+        allowed = ', '.join(f"'{v}'" for v in values)
+        text = 'TEXT' if sqlite else f"VARCHAR({max(len(v) for v in values)})"
+        return f"{text}{rest} CHECK ({quote_identifier(col)} IN ({allowed}))"
+    return ('TEXT' if sqlite or base == 'TEXT' else base + args) + rest
+
+
+def create_table_dialect(table_name, cols, col_types, dialect):
+    """CREATE TABLE (+ subdomain index) for PostgreSQL or SQLite"""
+    table = quote_identifier(table_name)
+    key = 'INTEGER PRIMARY KEY' if dialect == 'sqlite' else 'SERIAL PRIMARY KEY'
+
+    lines = [f"  {quote_identifier('no')} {key}"]
+    for col, col_type in zip(cols, col_types):
+        if col != 'no':  # Skip if 'no' already exists
+            lines.append(f"  {quote_identifier(col)} {translate_type(col, col_type, dialect)}")
+
+    create = f"CREATE TABLE IF NOT EXISTS {table} (\n" + ',\n'.join(lines) + "\n);\n"
+    if 'subdomain' in cols:
+        index = quote_identifier(f"{table_name}_subdomain")
+        create += f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({quote_identifier('subdomain')});\n"
+    return create + "\n"
+
+
+def _valid_date(text):
+    try:
+        date.fromisoformat(text)
+        return True
+    except ValueError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def compile_copy_encoder(col_type):
+    """Encoder for one PostgreSQL COPY text field"""
+    encode = compile_text_encoder(col_type)
+
+    if column_kind(col_type) == 'date':
+        def encode_field(val):
+            text = encode(val)
+            # Zero dates and anything PostgreSQL would reject load as NULL
+            return text if _valid_date(text) else '\\N'
+        return encode_field
+
+    def encode_field(val):
+        return encode(val).translate(_COPY_ESCAPES)
+    return encode_field
+
+
+@lru_cache(maxsize=None)
+def compile_sqlite_encoder(col_type):
+    """Encoder for one SQLite literal (no backslash escapes in SQLite)"""
+    encode = compile_text_encoder(col_type)
+
+    if column_kind(col_type) in ('int', 'decimal'):
+        return encode
+
+    def encode_literal(val):
+        return "'" + encode(val).replace("'", "''") + "'"
+    return encode_literal
+
+
+def _iter_chunks(df, chunk_rows):
+    """Row tuples of df, chunk_rows at a time"""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].itertuples(index=False, name=None)
+
+
+def _loaded_columns(df, cols, col_types):
+    """df, cols and col_types without DIALECT_SKIP_COLUMNS"""
+    keep = [i for i, c in enumerate(cols) if c not in DIALECT_SKIP_COLUMNS]
+    if len(keep) == len(cols):
+        return df, cols, col_types
+    return df.iloc[:, keep], [cols[i] for i in keep], [col_types[i] for i in keep]
+
+
+def _iter_copy(df, table_name, cols, col_types, chunk_rows):
+    """COPY ... FROM STDIN block, one tab-separated line per row"""
+    encoders = [compile_copy_encoder(t) for t in col_types]
+    cols_str = ', '.join(quote_identifier(c) for c in cols)
+
+    yield f"COPY {quote_identifier(table_name)} ({cols_str}) FROM STDIN;\n"
+    done = 0
+    for rows in _iter_chunks(df, chunk_rows):
+        lines = ['\t'.join([enc(v) for enc, v in zip(encoders, row)]) + '\n' for row in rows]
+        done += len(lines)
+        yield ''.join(lines)
+        print(f"  ✓ Encoded {done}/{len(df)} rows...")
+    yield "\\.\n"
+
+    print(f"\n✅ Done! Generated COPY block with {len(df)} rows\n")
+
+
+def _iter_sqlite_inserts(df, table_name, cols, col_types, rows_per_insert,
+                         max_statement_bytes, chunk_rows):
+    """Multi-row INSERT statements, chunked like _iter_inserts"""
+    encoders = [compile_sqlite_encoder(t) for t in col_types]
+    cols_str = ', '.join(quote_identifier(c) for c in cols)
+    prefix = f"INSERT INTO {quote_identifier(table_name)} ({cols_str}) VALUES "
+
+    done = 0
+    for rows in _iter_chunks(df, chunk_rows):
+        values = ['(' + ', '.join([enc(v) for enc, v in zip(encoders, row)]) + ')' for row in rows]
+        done += len(values)
+        yield from group_inserts(values, prefix, rows_per_insert, max_statement_bytes)[0]
+        print(f"  ✓ Encoded {done}/{len(df)} rows...")
+
+
+def iter_sql_dialect(df, dialect='mysql', table_name="psb_member", rows_per_insert=500,
+                     max_statement_bytes=None, include_create=True, chunk_rows=ENCODE_CHUNK_ROWS):
+    """Yield a load script for the chosen dialect piece by piece
+
+    Args:
+        df (pd.DataFrame): Parsed data (with subdomain, as in main.py)
+        dialect (str): 'mysql', 'postgresql' or 'sqlite'
+        table_name (str): Target table
+        rows_per_insert (int): Rows per INSERT (mysql, sqlite)
+        max_statement_bytes (int): Byte cap per INSERT (default: the
+            MySQL packet size, or SQLite's maximum statement length)
+        include_create (bool): Start with CREATE TABLE
+        chunk_rows (int): Rows encoded per step
+
+    Yields:
+        str: Script pieces, write them with save_sql_stream
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown dialect '{dialect}', expected one of {', '.join(DIALECTS)}")
+
+    if dialect == 'mysql':
+        yield from iter_sql_advanced(df, table_name, rows_per_insert,
+                                     max_statement_bytes or DEFAULT_MAX_ALLOWED_PACKET,
+                                     include_create, chunk_rows)
+        return
+
+    df, cols, col_types = _resolve_columns(df, table_name)
+    if include_create:
+        yield create_table_dialect(table_name, cols, col_types, dialect)
+    df, cols, col_types = _loaded_columns(df, cols, col_types)
+
+    if dialect == 'postgresql':
+        yield from _iter_copy(df, table_name, cols, col_types, chunk_rows)
+        return
+
+    yield "BEGIN TRANSACTION;\n"
+    yield from file_pieces(None, _iter_sqlite_inserts(df, table_name, cols, col_types, rows_per_insert,
+                                                      max_statement_bytes or SQLITE_MAX_STATEMENT_BYTES,
+                                                      chunk_rows))
+    yield "COMMIT;\n"
@@ -1,8 +1,47 @@
 """
 HTML Parser Module - Parse HTML tables to DataFrame
 """
-import pandas as pd
-from bs4 import BeautifulSoup
+import io
+import pickle
+import re
+from collections import deque
+from contextlib import redirect_stdout
+from html import unescape
+from html.entities import html5, name2codepoint
+from html.parser import HTMLParser
+from itertools import chain
+
+from . import parse_cache
+from .html_repair import repair_html
+from .html_source import (
+    SOURCE_ENCODINGS, decode_span, iter_decoded, open_mapped, plain_rows, plan_row_ranges, table_span
+)
+from .parallel import imap_ordered
+
+# pandas, BeautifulSoup and lxml are imported on first use: the streaming
+# row parser and cell cleaner (fused/batch path) need none of them
+
+# Block size used when streaming HTML from disk
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Cell normalization applied while rows are extracted
+DEFAULT_CLEANING = {
+    'null_values': ('', '0000-00-00', '0000-00-00 00:00:00'),  # → None
+    'strip_apostrophe': True,  # Excel-style leading ' text marker
+}
+
+# Backends accepted by parse_html_table(backend=...): 'export' is the
+# regex extractor for the admin panel's <table id='mytable'> export
+PARSER_BACKENDS = ('auto', 'lxml', 'bs4', 'export')
+
+# Tables smaller than this are parsed in one process even when workers > 1
+PARALLEL_PARSE_MIN_BYTES = 4 * 1024 * 1024
+
+# Row ranges per worker process (smaller ranges balance the load better)
+RANGES_PER_WORKER = 4
+
+# Bump whenever parsing or cleaning output changes (part of the parse cache key)
+PARSER_VERSION = 3
 
 
 def input_html():
@@ -24,131 +63,600 @@ def input_html():
 
 
 def auto_fix_html(html_content):
-    """Auto-fix HTML table - add missing </tr> tags"""
-    lines = html_content.split('\n')
-    fixed = []
-    in_tr = False
-    
-    for line in lines:
-        s = line.strip()
-        
-        # Opening <tr>
-        if s.startswith('<tr'):
-            if in_tr:  # Close previous unclosed <tr>
-                fixed.append('</tr>')
-            fixed.append(line)
-            in_tr = True
-        
-        # Closing </tr>
-        elif '</tr>' in s:
-            fixed.append(line)
-            in_tr = False
-        
-        # Table end
-        elif s.startswith('</table>'):
-            if in_tr:
-                fixed.append('</tr>')
-                in_tr = False
-            fixed.append(line)
-        
-        # Regular content
+    """Auto-fix HTML table - add missing </tr>, </td> and </th> tags
+
+    Single pass over the markup (see html_repair.HTMLRepairer), so it
+    also works on minified exports with many rows per line.
+    """
+    return repair_html(html_content)
+
+
+# Named references as BeautifulSoup resolves them (name without ';')
+_NAMED_REFS = {name[:-1]: char for name, char in html5.items() if name.endswith(';')}
+
+
+class _TableRowParser(HTMLParser):
+    """Incremental parser that collects the <tr> rows of the first <table>
+
+    Rows are queued in ``self.rows`` as soon as their <tr> is closed (or
+    implicitly closed by the next <tr> / </table>), so callers can drain
+    the queue after every ``feed()`` and memory stays bounded by one row.
+    Text of <td> positions dropped by ``select`` is never assembled, it is
+    only probed for the blank-row check.
+    Character references are resolved like BeautifulSoup does on top of
+    html.parser ('&copy2023' and '&ltb' stay as written).
+    """
+
+    def __init__(self, select=None):
+        super().__init__(convert_charrefs=False)
+        self.rows = deque()
+        self.found_table = False
+        self.done = False
+        self._select = select
+        self._keep = None        # kept <td> positions, None = all
+        self._keep_order = None  # the same positions in output order
+        self._depth = 0          # <table> nesting depth
+        self._header_seen = False
+        self._row = None         # cell texts of the open <tr> (None = dropped)
+        self._other_text = False # a dropped cell of the open <tr> has text
+        self._cell_tag = None    # 'td' / 'th' while inside a cell
+        self._mode = None        # 'keep', 'probe' or 'ignore' for the open cell
+        self._parts = []         # stripped text fragments of the open cell
+        self._frag = []          # raw data of the current text fragment
+        self._skip = 0           # inside <script>/<style>
+
+    def _flush_fragment(self):
+        if self._frag:
+            text = ''.join(self._frag).strip()
+            if text:
+                self._parts.append(text)
+            self._frag = []
+
+    def _start_cell(self, tag):
+        self._end_cell()
+        self._cell_tag = tag
+        # First <tr> holds the headers (<th>), the rest hold data (<td>)
+        if tag != ('td' if self._header_seen else 'th'):
+            self._mode = 'ignore'
+        elif self._keep is None or len(self._row) in self._keep:
+            self._mode = 'keep'
         else:
-            fixed.append(line)
-    
-    # Final cleanup
-    if in_tr:
-        fixed.append('</tr>')
-    
-    return '\n'.join(fixed)
+            self._mode = 'probe'
+
+    def _end_cell(self):
+        if self._cell_tag is None:
+            return
+        if self._mode == 'keep':
+            self._flush_fragment()
+            self._row.append(''.join(self._parts))
+        elif self._mode == 'probe':
+            self._row.append(None)
+        self._cell_tag = None
+        self._mode = None
+        self._parts = []
+        self._frag = []
+
+    def _end_row(self):
+        if self._row is None:
+            return
+        self._end_cell()
+        cells = self._row
+        if not self._header_seen:
+            self._header_seen = True
+            if self._select is not None:
+                self._keep_order = self._select(cells)
+                self._keep = frozenset(self._keep_order)
+            self.rows.append(cells)
+        elif not cells:
+            self.rows.append(None)
+        elif self._keep is None:
+            self.rows.append(cells if any(cells) else None)
+        else:
+            n = len(cells)
+            projected = [cells[i] if i < n else '' for i in self._keep_order]
+            blank = not any(projected) and not self._other_text
+            self.rows.append(None if blank else projected)
+        self._row = None
+        self._other_text = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        self._flush_fragment()
+        if tag == 'table':
+            self.found_table = True
+            self._depth += 1
+        elif not self._depth:
+            return
+        elif tag == 'tr':
+            self._end_row()
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None:
+            self._start_cell(tag)
+        elif tag in ('script', 'style'):
+            self._skip += 1
 
+    def handle_endtag(self, tag):
+        if self.done or not self._depth:
+            return
+        self._flush_fragment()
+        if tag == 'table':
+            self._depth -= 1
+            if not self._depth:
+                self._end_row()
+                self.done = True
+        elif tag == 'tr':
+            self._end_row()
+        elif tag in ('td', 'th'):
+            self._end_cell()
+        elif tag in ('script', 'style') and self._skip:
+            self._skip -= 1
 
-def parse_html_table(html_content):
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._mode == 'keep':
+            self._frag.append(data)
+        elif self._mode == 'probe' and not self._other_text:
+            self._other_text = not data.isspace()
+
+    def handle_entityref(self, name):
+        self.handle_data(_NAMED_REFS.get(name, '&' + name))
+
+    def handle_charref(self, name):
+        # unescape() drops control characters, BeautifulSoup keeps them
+        num = int(name[1:], 16) if name[0] in 'xX' else int(name)
+        self.handle_data(unescape(f'&#{name};') or chr(num))
+
+    def handle_comment(self, data):
+        self._flush_fragment()
+
+    def close(self):
+        super().close()
+        self._end_row()
+        if self.found_table and not self._header_seen:
+            self.rows.append([])
+            self._header_seen = True
+
+
+def iter_table_rows(chunks, select=None):
+    """Stream the first <table> one <tr> at a time
+
+    Args:
+        chunks (iterable): HTML text pieces (e.g. file blocks)
+        select (callable): Optional select(headers) -> list of column
+            indices to extract; other cells are skipped
+
+    Yields:
+        list: All header texts (<th> of the first row) first. Then, for
+        every following row, the <td> texts of the selected columns
+        (padded with ''), or None when the row has no <td> or is blank.
+        Nothing is yielded if the input has no <table>.
     """
-    Parse HTML table to DataFrame
+    parser = _TableRowParser(select)
+    for chunk in chunks:
+        parser.feed(chunk)
+        while parser.rows:
+            yield parser.rows.popleft()
+        if parser.done:
+            break
+    parser.close()
+    while parser.rows:
+        yield parser.rows.popleft()
+
+
+def _row_cells(nodes, keep, text):
+    """Selected cell texts of one row, or None if the row is blank
     
     Args:
-        html_content (str): HTML string containing table
-        
+        nodes (list): The row's <td> nodes
+        keep (list): Column indices to extract, None for all
+        text (callable): node -> stripped text
+    """
+    if not nodes:
+        return None
+    if keep is None:
+        cells = [text(node) for node in nodes]
+        return cells if any(cells) else None
+    
+    n = len(nodes)
+    cells = [text(nodes[i]) if i < n else '' for i in keep]
+    # Dropped cells only matter for deciding whether the row is blank
+    if any(cells) or any(text(node) for node in nodes):
+        return cells
+    return None
+
+
+def _soup_text(node):
+    return node.get_text(strip=True)
+
+
+def _iter_soup_rows(html_content, select=None):
+    """Same row protocol as iter_table_rows, on a full BeautifulSoup tree"""
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    table = soup.find('table')
+    if not table:
+        return
+    
+    header_row = table.find('tr')
+    headers = [th.get_text(strip=True) for th in header_row.find_all('th')] if header_row else []
+    yield headers
+    
+    keep = select(headers) if select else None
+    for tr in table.find_all('tr')[1:]:  # Skip header row
+        yield _row_cells(tr.find_all('td'), keep, _soup_text)
+
+
+# Row/cell tags whose open/close counts must match for the lxml fast path
+_STRUCTURE_TAG_RE = re.compile(r'<(/?)(tr|td|th)\b', re.IGNORECASE)
+
+# '&#' that html.parser can't read as a number, or a named reference
+# (with optional ';')
+_REFERENCE_RE = re.compile(
+    r'&(?:#(?!(?:[0-9]+|[xX][0-9a-fA-F]+)[^0-9a-fA-F])|([A-Za-z][A-Za-z0-9]*)(;?))')
+_ENTITY_NAMES = frozenset(name.rstrip(';') for name in html5)
+
+# (lxml.html, etree, text XPath) once imported, False when not installed
+_LXML = None
+
+
+def _load_lxml():
+    """Import lxml on first use
+    
     Returns:
-        pd.DataFrame or None: Parsed data as DataFrame
+        tuple or None: (lxml.html, etree, text XPath), None without lxml
     """
-    try:
-        # Auto-fix HTML first
-        print("🔧 Fixing HTML structure...")
-        html_content = auto_fix_html(html_content)
-        
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        table = soup.find('table')
-        
-        if not table:
-            print("❌ No <table> found in HTML")
+    global _LXML
+    if _LXML is None:
+        try:
+            import lxml.html
+            from lxml import etree
+        except ImportError:  # lxml is optional, BeautifulSoup covers everything
+            _LXML = False
+        else:
+            _LXML = (lxml.html, etree,
+                     etree.XPath('.//text()[not(ancestor::script or ancestor::style)]'))
+    return _LXML or None
+
+
+def _lxml_text(el):
+    """get_text(strip=True) equivalent for an lxml element"""
+    if not len(el):
+        return (el.text or '').strip()
+    return ''.join(t.strip() for t in _LXML[2](el))
+
+
+def _lxml_reads_differently(html_content):
+    """True if libxml2 would read text other than html.parser/BeautifulSoup
+    
+    libxml2 turns '\r' into '\n', only knows the HTML 4 entities and
+    expands a known name at the start of a reference without ';'
+    ('&ltb', '&copy2023'), which BeautifulSoup keeps as written.
+    """
+    if '\r' in html_content:
+        return True
+    for m in _REFERENCE_RE.finditer(html_content):
+        name, semicolon = m.groups()
+        if name is None:
+            return True  # Malformed '&#', html.parser reads it erratically
+        if semicolon:
+            if name not in name2codepoint:
+                return True
+        elif any(name[:i] in _ENTITY_NAMES for i in range(1, len(name) + 1)):
+            return True
+    return False
+
+
+def _lxml_rows(html_content, select=None):
+    """Row iterator over an lxml.html tree, or None if the fast path is unsafe
+    
+    lxml and html.parser repair broken markup differently, so the fast
+    path is only taken when every <tr>/<td>/<th> is explicitly closed and
+    lxml built exactly one element per tag found in the source. Text
+    libxml2 reads differently (see _lxml_reads_differently) also returns
+    None.
+    """
+    modules = _load_lxml()
+    if modules is None:
+        return None
+    lxml_html, etree, _ = modules
+    
+    if _lxml_reads_differently(html_content):
+        return None
+    
+    counts = {}
+    for m in _STRUCTURE_TAG_RE.finditer(html_content):
+        key = (m.group(1), m.group(2).lower())
+        counts[key] = counts.get(key, 0) + 1
+    
+    for tag in ('tr', 'td', 'th'):
+        if counts.get(('', tag), 0) != counts.get(('/', tag), 0):
             return None
-        
-        # Extract headers
-        headers = []
-        header_row = table.find('tr')
-        if header_row:
-            for th in header_row.find_all('th'):
-                headers.append(th.get_text(strip=True))
-        
-        if not headers:
-            print("❌ No headers (<th>) found in table")
+    
+    try:
+        root = lxml_html.document_fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return None
+    
+    for tag in ('tr', 'td', 'th'):
+        if sum(1 for _ in root.iter(tag)) != counts.get(('', tag), 0):
             return None
+    
+    table = next(root.iter('table'), None)
+    if table is None:
+        return iter(())
+    
+    def rows():
+        trs = list(table.iter('tr'))
+        headers = [_lxml_text(th) for th in trs[0].iter('th')] if trs else []
+        yield headers
         
-        print(f"📊 Found {len(headers)} columns: {headers[:5]}..." if len(headers) > 5 else f"📊 Found {len(headers)} columns")
-        
-        # Extract data rows
-        rows = []
-        all_trs = table.find_all('tr')
-        
-        for i, tr in enumerate(all_trs[1:], 1):  # Skip header row
-            tds = tr.find_all('td')
-            
-            if not tds:
-                continue
-            
-            # Get cell values
-            cells = [td.get_text(strip=True) for td in tds]
-            
-            # Skip completely empty rows
-            if not cells or all(c == '' for c in cells):
-                continue
-            
-            # Adjust cell count to match headers
-            if len(cells) < len(headers):
-                cells.extend([''] * (len(headers) - len(cells)))
-            elif len(cells) > len(headers):
-                cells = cells[:len(headers)]
-            
-            rows.append(cells)
-            
-            # Progress indicator for first few rows
-            if i <= 3:
-                print(f"  Row {i}: {len(cells)} cells")
-        
-        if not rows:
-            print("❌ No data rows found")
+        keep = select(headers) if select else None
+        for tr in trs[1:]:  # Skip header row
+            yield _row_cells(list(tr.iter('td')), keep, _lxml_text)
+    
+    return rows()
+
+
+# The admin panel export: <table id='mytable' ...> (see test.py)
+# Attributes are only accepted as plain name, name=value or quoted values
+# without '<' / '>', so a tag always ends at the first '>' after it
+_EXPORT_ATTRS = r'(?:\s+[^\s"\'<>/=]+(?:\s*=\s*(?:"[^"<>]*"|\'[^\'<>]*\'|[^\s"\'<>=`]+))?)*\s*>'
+_EXPORT_TABLE_RE = re.compile(
+    r'<table(?=[^<>]*?\sid\s*=\s*["\']?mytable["\'\s>])' + _EXPORT_ATTRS, re.IGNORECASE)
+_FIRST_TABLE_RE = re.compile(r'<table(?=[\s/>])', re.IGNORECASE)
+
+# Markup that changes which table comes first or how it parses
+_EXPORT_PREFIX_RE = re.compile(
+    r'<!--|<(?:script|style|textarea|title|xmp|plaintext|iframe|noembed|noframes|noscript)(?=[\s/>])',
+    re.IGNORECASE)
+
+# One row: <tr>, cells holding nothing but text, optional </tr>
+_EXPORT_ROW_RE = re.compile(
+    r'\s*<tr(?=[\s>])' + _EXPORT_ATTRS
+    + r'(?P<cells>(?:\s*<(?P<tag>t[dh])(?=[\s>])' + _EXPORT_ATTRS + r'[^<]*</(?P=tag)\s*>)*)'
+    r'\s*(?:</tr\s*>)?',
+    re.IGNORECASE)
+_EXPORT_CELL_RE = re.compile(r'<(t[dh])(?=[\s>])' + _EXPORT_ATTRS + r'([^<]*)<', re.IGNORECASE)
+_EXPORT_END_RE = re.compile(r'\s*</table\s*>', re.IGNORECASE)
+
+# Inside the cells of a row: spans, control characters ('\r' included,
+# backends disagree on it) and any character reference other than the
+# ones PHP's htmlspecialchars writes (a bare '&' is plain text everywhere).
+# Entity names are case-sensitive: '&Amp;' is not '&amp;'
+_EXPORT_ANOMALY_RE = re.compile(
+    r'colspan|rowspan|[\x00-\x08\x0b-\x1f\x7f]'
+    r'|(?-i:&(?=[A-Za-z0-9#])(?!(?:amp|lt|gt|quot|nbsp|#0*39|#x0*27);))',
+    re.IGNORECASE)
+
+
+def _export_text(text):
+    """Cell text as a tree backend would extract it"""
+    return unescape(text).strip() if '&' in text else text.strip()
+
+
+def _export_rows(html_content, select=None):
+    """Row iterator for the admin panel export, or None if it isn't one
+    
+    The export is extracted with regexes, without building a tree. Only
+    exactly what the tree backends are known to read the same way is
+    accepted: <table id='mytable'> as first table, rows of text-only
+    <th>/<td> cells (</tr> may be missing). Anything else (nested tags,
+    colspan/rowspan, comments, scripts, unusual entities, ...) returns
+    None so the general parser is used.
+    """
+    first = _FIRST_TABLE_RE.search(html_content)
+    table = _EXPORT_TABLE_RE.match(html_content, first.start()) if first else None
+    if table is None:
+        return None
+    start = first.start()
+    if (_EXPORT_PREFIX_RE.search(html_content, 0, start)
+            or html_content.rfind('<', 0, start) > html_content.rfind('>', 0, start)):
+        return None
+    
+    # Validate the whole table before yielding anything
+    pos = table.end()
+    rows = []
+    while True:
+        m = _EXPORT_ROW_RE.match(html_content, pos)
+        if m is None:
+            break
+        cells = m.group('cells')
+        if _EXPORT_ANOMALY_RE.search(cells):
             return None
+        rows.append(cells)
+        pos = m.end()
+    if not _EXPORT_END_RE.match(html_content, pos):
+        return None
+    
+    def extract():
+        cells = _EXPORT_CELL_RE.findall(rows[0]) if rows else []
+        headers = [_export_text(text) for tag, text in cells if tag.lower() == 'th']
+        yield headers
         
-        print(f"✅ Parsed {len(rows)} data rows\n")
+        keep = select(headers) if select else None
+        for row in rows[1:]:
+            tds = [text for tag, text in _EXPORT_CELL_RE.findall(row) if tag.lower() == 'td']
+            yield _row_cells(tds, keep, _export_text)
+    
+    return extract()
+
+
+def _select_backend(html_content, backend, select=None):
+    """Pick the row iterator for a tree backend
+    
+    Returns:
+        tuple: (backend name, row iterator)
+    """
+    if backend in ('auto', 'lxml'):
+        rows = _lxml_rows(html_content, select)
+        if rows is not None:
+            return 'lxml', rows
+        if _load_lxml() is None:
+            print("⚠️  lxml not installed, using BeautifulSoup")
+        else:
+            print("⚠️  Irregular table structure, falling back to BeautifulSoup")
+    
+    return 'bs4', _iter_soup_rows(html_content, select)
+
+
+def _html_rows(html_content, backend, select=None):
+    """Export fast path, or auto_fix_html + tree backend
+    
+    Returns:
+        tuple: (backend name, row iterator)
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend} (choose from {', '.join(PARSER_BACKENDS)})")
+    
+    if backend in ('auto', 'export'):
+        rows = _export_rows(html_content, select)
+        if rows is not None:
+            return 'export', rows
+        if backend == 'export':
+            print("⚠️  Not a plain admin panel export, using the general parser")
+            backend = 'auto'
+    
+    print("🔧 Fixing HTML structure...")
+    return _select_backend(auto_fix_html(html_content), backend, select)
+
+
+def _cleaning_rules(cleaning):
+    """Merge user cleaning options over DEFAULT_CLEANING"""
+    rules = dict(DEFAULT_CLEANING)
+    if cleaning:
+        unknown = set(cleaning) - set(rules)
+        if unknown:
+            raise ValueError(f"Unknown cleaning option(s): {', '.join(sorted(unknown))}")
+        rules.update(cleaning)
+    rules['null_values'] = frozenset(rules['null_values'])
+    return rules
+
+
+def make_cell_cleaner(cleaning=None):
+    """Build the per-cell normalizer for the given cleaning rules
+    
+    Null sentinels are checked before the apostrophe is stripped, so
+    "'0000-00-00" becomes '0000-00-00', not None.
+    
+    Returns:
+        callable: clean(text) -> str or None
+    """
+    rules = _cleaning_rules(cleaning)
+    null_values = rules['null_values']
+    
+    if rules['strip_apostrophe']:
+        def clean(c):
+            if c in null_values:
+                return None
+            return c[1:] if c[:1] == "'" else c
+    else:
+        def clean(c):
+            return None if c in null_values else c
+    
+    return clean
+
+
+def _build_dataframe(rows, cleaning=None, select=None):
+    """Build the cleaned DataFrame from a header-first row iterator"""
+    headers = next(rows, None)
+    if headers is None:
+        print("❌ No <table> found in HTML")
+        return None
+    
+    if not headers:
+        print("❌ No headers (<th>) found in table")
+        return None
+    
+    print(f"📊 Found {len(headers)} columns: {headers[:5]}..." if len(headers) > 5 else f"📊 Found {len(headers)} columns")
+    
+    if select is not None:
+        headers = [headers[i] for i in select(headers)]
+        print(f"🎯 Extracting {len(headers)} selected columns")
+    
+    clean = make_cell_cleaner(cleaning)
+    width = len(headers)
+    
+    # Extract data rows
+    data = []
+    for i, cells in enumerate(rows, 1):
+        # Rows without <td> and completely empty rows come through as None
+        if cells is None:
+            continue
         
-        # Create DataFrame
-        df = pd.DataFrame(rows, columns=headers)
+        # Adjust cell count to match headers
+        if len(cells) < width:
+            cells.extend([''] * (width - len(cells)))
+        elif len(cells) > width:
+            cells = cells[:width]
         
-        # Clean data
-        df = df.replace('', None)
-        df = df.replace('0000-00-00', None)
-        df = df.replace('0000-00-00 00:00:00', None)
+        # Clean while extracting: one pass, no per-rule DataFrame copies
+        data.append([clean(c) for c in cells])
         
-        # Clean leading apostrophes (Excel-style text markers)
-        for col in df.columns:
-            df[col] = df[col].apply(
-                lambda x: x[1:] if isinstance(x, str) and x.startswith("'") else x
-            )
+        # Progress indicator for first few rows
+        if i <= 3:
+            print(f"  Row {i}: {len(cells)} cells")
+    
+    if not data:
+        print("❌ No data rows found")
+        return None
+    
+    print(f"✅ Parsed {len(data)} data rows\n")
+    
+    # Create DataFrame
+    import pandas as pd
+    return pd.DataFrame(data, columns=headers)
+
+
+def clean_dataframe(df, cleaning=None):
+    """Normalize empty cells, zero dates and Excel apostrophes
+    
+    For DataFrames that did not come through the parser (which cleans
+    while extracting). Each text column is processed in one vectorized
+    pass and a single new DataFrame is built.
+    
+    Args:
+        df (pd.DataFrame): Raw string data
+        cleaning (dict): Overrides for DEFAULT_CLEANING
         
+    Returns:
+        pd.DataFrame: Cleaned copy
+    """
+    import pandas as pd
+    
+    rules = _cleaning_rules(cleaning)
+    null_values = list(rules['null_values'])
+    
+    columns = []
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        if pd.api.types.infer_dtype(col, skipna=True) in ('string', 'empty'):
+            text = col.astype(object)
+            is_null = text.isin(null_values)
+            if rules['strip_apostrophe']:
+                quoted = text.str.startswith("'", na=False)
+                text = text.where(~quoted, text.str[1:])
+            col = text.mask(is_null, None)
+        columns.append(col.reset_index(drop=True))
+    
+    cleaned = pd.concat(columns, axis=1, ignore_index=True) if columns else df.copy()
+    cleaned.columns = df.columns
+    cleaned.index = df.index
+    return cleaned
+
+
+def _parse_rows(rows, backend, cleaning=None, select=None):
+    """Run _build_dataframe with the module's error reporting"""
+    try:
+        print(f"🧩 Parser backend: {backend}")
+        df = _build_dataframe(rows, cleaning, select)
+        if df is not None:
+            df.attrs['parser_backend'] = backend
         return df
-        
+    except UnicodeDecodeError:
+        raise  # parse_html_from_file retries with the next encoding
     except Exception as e:
         print(f"❌ Error parsing HTML: {e}")
         import traceback
@@ -156,20 +664,267 @@ def parse_html_table(html_content):
         return None
 
 
-def parse_html_from_file(file_path):
+def _cache_options(streaming, backend, cleaning, columns):
+    """Options that shape the parsed table, or None when it can't be cached
+    
+    A column selection is identified by its qualified name, so lambdas
+    and nested functions (no stable name) bypass the cache.
+    """
+    if columns is not None:
+        name = getattr(columns, '__qualname__', None)
+        module = getattr(columns, '__module__', None)
+        if not name or not module or '<' in name:
+            return None
+        columns = f"{module}.{name}"
+    try:
+        rules = _cleaning_rules(cleaning)
+    except ValueError:
+        return None  # Reported by the parse itself
+    rules['null_values'] = tuple(sorted(rules['null_values']))
+    return {
+        'parser': PARSER_VERSION,
+        'streaming': streaming,
+        'backend': backend,
+        'cleaning': tuple(sorted(rules.items())),
+        'columns': columns,
+    }
+
+
+def _cache_lookup(digest, source, streaming, backend, cleaning, columns):
+    """Parse cache key and cached DataFrame (None on a miss)"""
+    options = _cache_options(streaming, backend, cleaning, columns)
+    if options is None:
+        return None, None
+    key = parse_cache.make_key(digest, source=source, **options)
+    df = parse_cache.load(key)
+    if df is not None:
+        print(f"⚡ Parse cache hit: {len(df)} rows, HTML parsing skipped")
+    return key, df
+
+
+def parse_html_table(html_content, streaming=False, backend='auto', cleaning=None,
+                     columns=None, cache=True):
+    """
+    Parse HTML table to DataFrame
+    
+    Args:
+        html_content (str): HTML string containing table
+        streaming (bool): Use the incremental row parser instead of
+            building a tree
+        backend (str): 'lxml', 'bs4', 'export' (regex extractor for the
+            admin panel export, general parser for anything else) or
+            'auto' (export, then lxml when the table is well-formed,
+            BeautifulSoup otherwise). The one used is stored in
+            ``df.attrs['parser_backend']``
+        cleaning (dict): Overrides for DEFAULT_CLEANING, e.g.
+            ``{'strip_apostrophe': False}``
+        columns (callable): columns(headers) -> indices of the columns to
+            extract, e.g. sql_generator_advance.select_valid_columns.
+            Cells of other columns are never extracted or stored
+        cache (bool): Reuse/store the result in the on-disk parse cache
+            (see parse_cache), keyed by the content hash and options
+        
+    Returns:
+        pd.DataFrame or None: Parsed data as DataFrame
+    """
+    key = None
+    if cache and isinstance(html_content, str):
+        key, df = _cache_lookup(parse_cache.text_digest(html_content), 'text',
+                                streaming, backend, cleaning, columns)
+        if df is not None:
+            return df
+    
+    df = _parse_html_text(html_content, streaming, backend, cleaning, columns)
+    if key and df is not None:
+        parse_cache.store(key, df)
+    return df
+
+
+def _parse_html_text(html_content, streaming, backend, cleaning, columns):
+    """parse_html_table without the cache"""
+    if streaming:
+        # Missing </tr> are closed implicitly by the next <tr>/</table>
+        print("🌊 Streaming HTML rows...")
+        return _parse_rows(iter_table_rows([html_content], columns), 'stream', cleaning, columns)
+    
+    try:
+        name, rows = _html_rows(html_content, backend, columns)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return None
+    return _parse_rows(rows, name, cleaning, columns)
+
+
+def read_chunks(f, size=STREAM_CHUNK_SIZE):
+    """Yield fixed-size text blocks from an open file"""
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _report_encoding(encoding):
+    if encoding != SOURCE_ENCODINGS[0]:
+        print(f"⚠️  File is not UTF-8, decoded as {encoding}")
+
+
+def _parse_mapped_rows(data, start, end, cleaning, columns):
+    """Streaming parse of a mapped byte range, restarting on a decode error"""
+    for encoding in SOURCE_ENCODINGS:
+        try:
+            chunks = iter_decoded(data, start, end, encoding, STREAM_CHUNK_SIZE)
+            df = _parse_rows(iter_table_rows(chunks, columns), 'stream', cleaning, columns)
+        except UnicodeDecodeError:
+            continue
+        _report_encoding(encoding)
+        return df
+    return None
+
+
+def _parse_row_range(span, file_path, head, streaming, backend, columns, encodings):
+    """Parse one row range of a file in its own <table> (worker entry point)
+    
+    Args:
+        span (tuple): (start, end) byte range of the rows
+        head (tuple): Byte range of the header context (<table> ... first row)
+        encodings (tuple): Encodings to try, see SOURCE_ENCODINGS
+    
+    Returns:
+        tuple: (encoding, result), result is None when the range is not
+        plain rows (see html_source.plain_rows), else (backend name,
+        headers, data rows without the None entries). encoding is None
+        when none of the encodings fits the range
+    """
+    with open_mapped(file_path) as data:
+        last = span[1] >= len(data)
+        if not plain_rows(data, span[0], span[1], last):
+            return encodings[0], None
+        for encoding in encodings:
+            try:
+                html = decode_span(data, *head, (encoding,))[0] + decode_span(data, *span, (encoding,))[0]
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            return None, None  # None of the encodings fits this range
+    
+    if not last:
+        html += '</table>'  # Closes the row left open at the cut, like the next <tr> would
+    
+    # Backend warnings would be repeated by every worker
+    with redirect_stdout(io.StringIO()):
+        if streaming:
+            name, rows = 'stream', iter_table_rows([html], columns)
+        else:
+            name, rows = _html_rows(html, backend, columns)
+        headers = next(rows, None)
+        return encoding, (name, headers, [cells for cells in rows if cells is not None])
+
+
+def _parse_parallel(file_path, data, start, end, streaming, backend, cleaning, columns, workers):
+    """Parse the table's row ranges in worker processes
+    
+    Returns:
+        tuple: (handled, df). handled is False when the table can't be
+        split safely; the caller then parses it in one process
+    """
+    if backend not in PARSER_BACKENDS:
+        return False, None  # Reported by the serial parse
+    try:
+        pickle.dumps(columns)
+    except Exception:
+        print("⚠️  Column selection can't be sent to worker processes, parsing serially")
+        return False, None
+    
+    plan = plan_row_ranges(data, start, end, workers * RANGES_PER_WORKER)
+    if plan is None:
+        return False, None
+    head, spans = plan
+    
+    print(f"⚡ Parsing {len(spans)} row ranges with {workers} worker processes")
+    args = (file_path, head, streaming, backend, columns)
+    results = list(imap_ordered(_parse_row_range, spans, workers, args=args + (SOURCE_ENCODINGS,)))
+    if any(result is None for _, result in results):
+        print("⚠️  Comments, scripts, nested tables or '<' in attributes between rows, parsing serially")
+        return False, None
+    
+    # The file decodes as the first encoding that fits every range: ranges
+    # that fit an earlier one are parsed again from the latest so far on,
+    # until they all agree (e.g. UTF-8 in one range, cp1252 in another
+    # ends up as latin-1 for all, like the serial parse)
+    encoding = max((enc for enc, _ in results), key=SOURCE_ENCODINGS.index)
+    while any(enc != encoding for enc, _ in results):
+        later = SOURCE_ENCODINGS[SOURCE_ENCODINGS.index(encoding):]
+        for i, (enc, _) in enumerate(results):
+            if enc != encoding:
+                results[i] = _parse_row_range(spans[i], *args, later)
+        if any(enc is None for enc, _ in results):
+            print("⚠️  Row ranges don't decode with one encoding, parsing serially")
+            return False, None
+        encoding = max((enc for enc, _ in results), key=SOURCE_ENCODINGS.index)
+    _report_encoding(encoding)
+    
+    names = sorted({name for _, (name, _, _) in results})
+    headers = results[0][1][1]
+    rows = chain([headers], chain.from_iterable(rows for _, (_, _, rows) in results))
+    return True, _parse_rows(rows, '+'.join(names), cleaning, columns)
+
+
+def parse_html_from_file(file_path, streaming=False, backend='auto', cleaning=None,
+                         columns=None, cache=True, workers=1):
     """Parse HTML table from file
     
+    The file is memory-mapped, hashed for the cache from the mapping, and
+    decoded from its first <table> on: UTF-8, falling back to cp1252 /
+    latin-1.
+    
     Args:
         file_path (str): Path to HTML file
+        streaming (bool): Parse block by block straight from the mapped
+            file instead of decoding the whole table first
+        backend (str): Parser backend, see parse_html_table
+        cleaning (dict): Cleaning overrides, see parse_html_table
+        columns (callable): Column selection, see parse_html_table
+        cache (bool): Use the parse cache, keyed by the file's bytes
+        workers (int): Split the rows at <tr> boundaries and parse the
+            ranges in this many processes (same result as one process).
+            Tables under PARALLEL_PARSE_MIN_BYTES, or with comments,
+            scripts or nested tables, are parsed in one process
         
     Returns:
         pd.DataFrame or None: Parsed data
     """
     try:
         print(f"📂 Reading file: {file_path}")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html = f.read()
-        return parse_html_table(html)
+        key = None
+        # Decoding starts at the first <table>
+        with open_mapped(file_path) as data:
+            if cache:
+                key, df = _cache_lookup(parse_cache.data_digest(data), 'file',
+                                        streaming, backend, cleaning, columns)
+                if df is not None:
+                    return df
+            
+            start, end = table_span(data)
+            html = None
+            handled = False
+            if workers > 1 and end - start >= PARALLEL_PARSE_MIN_BYTES:
+                handled, df = _parse_parallel(file_path, data, start, end, streaming, backend,
+                                              cleaning, columns, workers)
+            if not handled:
+                if streaming:
+                    print("🌊 Streaming HTML rows...")
+                    df = _parse_mapped_rows(data, start, end, cleaning, columns)
+                else:
+                    html, encoding = decode_span(data, start, end)
+                    _report_encoding(encoding)
+        if html is not None:
+            df = _parse_html_text(html, False, backend, cleaning, columns)
+        
+        if key and df is not None:
+            parse_cache.store(key, df)
+        return df
     except Exception as e:
         print(f"❌ Error reading file: {e}")
         return None
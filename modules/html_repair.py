@@ -0,0 +1,239 @@
+"""
+HTML Repair Module
+Close the <tr>, <td> and <th> tags an export left open, in one pass
+
+The admin panel export often drops </tr> (and sometimes </td>). This
+tokenizer walks the markup once, only stopping at table structure tags,
+and inserts the missing closing tags right where the next row/cell
+starts. Unlike the old line-based fixer it does not care how the markup
+is split into lines (minified exports work), skips comments and
+<script>/<style> bodies, and can run incrementally on chunks in front of
+a streaming parser or writer.
+"""
+import re
+
+
+# Rest of a tag after its name: attributes, quote-aware, up to '>'
+_ATTRS = r'[^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*>'
+
+# Structure tags we track, plus the starts of comments and raw text
+# (groups: token, '/' or '', tag name)
+_TOKEN = r'(<!--|<(/?)(tr|td|th|table|script|style)(?=[\s/>])' + _ATTRS + ')'
+_TOKEN_RE = re.compile(_TOKEN, re.IGNORECASE)
+
+# The next token when no other '<' comes before it, the common case
+_NEXT_TOKEN_RE = re.compile(r'[^<]*' + _TOKEN, re.IGNORECASE)
+
+# Cell content without any structure tag, comment or raw text element
+_CELL_TEXT = r'[^<]*(?:<(?!/?(?:t[rdh]|table|script|style)[\s/>]|!--)[^<]*)*'
+
+# Fast path: a whole row whose cells are all closed, ending either in
+# </tr> or (missing </tr>) right before the next <tr> / </table>. Such a
+# row needs at most one insertion, so it is handled in a single match
+# instead of one token per cell.
+_ROW_RE = re.compile(
+    r'\s*<tr(?=[\s/>])' + _ATTRS
+    + r'(?:\s*<(?P<cell>t[dh])(?=[\s/>])' + _ATTRS + _CELL_TEXT + r'</(?P=cell)\s*>)*\s*'
+    + r'(?:(?P<end></tr\s*>)|(?=<tr[\s/>]|</table[\s/>]))',
+    re.IGNORECASE)
+
+# A structure tag start that _TOKEN_RE skips: its attributes do not end
+# within the chunk (an open quote), so it may still complete
+_UNTERMINATED_RE = re.compile(r'</?(?:tr|td|th|table|script|style)(?=[\s/>])(?!' + _ATTRS + ')',
+                              re.IGNORECASE)
+
+# Past the last token: any structure tag start, or a bare '<' / tag name
+# prefix at the very end of the chunk
+_UNFINISHED_RE = re.compile(
+    r'</?(?:tr|td|th|table|script|style)(?=[\s/>])|<[!/]?[-A-Za-z]*\Z', re.IGNORECASE)
+
+# End of a comment / raw text element
+_RAW_END = {
+    'comment': re.compile(r'-->'),
+    'script': re.compile(r'</script(?=[\s/>])', re.IGNORECASE),
+    'style': re.compile(r'</style(?=[\s/>])', re.IGNORECASE),
+}
+
+# Longest terminator prefix that can hide at a chunk end ('</script' - 1)
+_RAW_TAIL = 8
+
+# An unfinished '<...' longer than this is treated as plain text
+MAX_PENDING = 64 * 1024
+
+
+class HTMLRepairer:
+    """Incremental </tr>, </td>, </th> inserter
+
+    Feed text chunks and write out what comes back; ``close()`` returns
+    the remainder (including closers for a row still open at the end).
+    Concatenated, the outputs equal ``repair_html`` of the whole input.
+    Memory is bounded by the chunk size, not the document size.
+
+    ``stats`` counts the rows of the input ('tr', '/tr') and the closers
+    inserted ('added_tr', 'added_td', 'added_th').
+    """
+
+    def __init__(self):
+        self._pending = ''
+        self._raw = None           # 'comment' / 'script' / 'style' while skipping
+        self._frames = [[False, None]]  # per open <table>: [in_tr, open cell tag]
+        self.stats = {key: 0 for key in ('tr', '/tr', 'added_tr', 'added_td', 'added_th')}
+
+    def _close_cell(self, frame, out):
+        if frame[1]:
+            out.append(f'</{frame[1]}>')
+            self.stats['added_' + frame[1]] += 1
+            frame[1] = None
+
+    def _close_row(self, frame, out):
+        self._close_cell(frame, out)
+        if frame[0]:
+            out.append('</tr>')
+            self.stats['added_tr'] += 1
+            frame[0] = False
+
+    def _handle(self, closing, name, out):
+        """Update the table state for one tag; closers go into out"""
+        frame = self._frames[-1]
+
+        if name == 'table':
+            if not closing:
+                self._frames.append([False, None])
+            else:
+                self._close_row(frame, out)
+                if len(self._frames) > 1:
+                    self._frames.pop()
+        elif name == 'tr':
+            self.stats[closing + 'tr'] += 1
+            if closing:
+                self._close_cell(frame, out)
+                frame[0] = False
+            else:
+                self._close_row(frame, out)
+                frame[0] = True
+        elif name in ('td', 'th'):
+            if not closing:
+                self._close_cell(frame, out)
+                frame[1] = name
+            elif frame[1]:
+                frame[1] = None
+        elif not closing:  # <script> / <style>
+            self._raw = name
+
+    def _scan(self, buf, final):
+        out = []
+        last = 0   # buf[last:pos] has not been copied to out yet
+        pos = 0
+        n = len(buf)
+        stats = self.stats
+
+        while pos < n:
+            if self._raw:
+                m = _RAW_END[self._raw].search(buf, pos)
+                if m is None:
+                    if not final:
+                        # A terminator may straddle the chunk boundary
+                        keep = max(pos, n - _RAW_TAIL)
+                        out.append(buf[last:keep])
+                        self._pending = buf[keep:]
+                        return ''.join(out)
+                    pos = n
+                    break
+                # Comments end after '-->', raw text at its closing tag
+                pos = m.end() if self._raw == 'comment' else m.start()
+                self._raw = None
+                continue
+
+            frame = self._frames[-1]
+            if not frame[0] and frame[1] is None:
+                m = _ROW_RE.match(buf, pos)
+                if m:
+                    pos = m.end()
+                    stats['tr'] += 1
+                    if m.group('end'):
+                        stats['/tr'] += 1
+                    else:
+                        out.append(buf[last:pos])
+                        out.append('</tr>')
+                        stats['added_tr'] += 1
+                        last = pos
+                    continue
+
+            m = _NEXT_TOKEN_RE.match(buf, pos)
+            if m is None:
+                m = _TOKEN_RE.search(buf, pos)
+                # A structure tag skipped on the way may still complete,
+                # and a token after it may be part of its quoted attribute
+                # value (title='<tr>'): wait for more input from there
+                if final:
+                    u = None
+                elif m is None:
+                    u = _UNFINISHED_RE.search(buf, pos)
+                else:
+                    u = _UNTERMINATED_RE.search(buf, pos, m.start())
+                if u is not None and n - u.start() < MAX_PENDING:
+                    cut = u.start()
+                    out.append(buf[last:cut])
+                    self._pending = buf[cut:]
+                    return ''.join(out)
+                if m is None:
+                    pos = n
+                    break
+
+            pos = m.end()
+            if m.group(3) is None:
+                self._raw = 'comment'
+                continue
+
+            inserted = []
+            self._handle(m.group(2), m.group(3).lower(), inserted)
+            if inserted:
+                start = m.start(1)
+                out.append(buf[last:start])
+                out.extend(inserted)
+                last = start
+
+        out.append(buf[last:])
+        self._pending = ''
+        return ''.join(out)
+
+    def feed(self, chunk):
+        """Repair the next piece of input
+
+        Returns:
+            str: Repaired text that is final (may be shorter than chunk)
+        """
+        return self._scan(self._pending + chunk, final=False)
+
+    def close(self):
+        """Flush the remaining input and close a row left open at the end"""
+        out = [self._scan(self._pending, final=True)]
+        closers = []
+        self._close_row(self._frames[-1], closers)
+        return ''.join(out + closers)
+
+
+def repair_html(html_content):
+    """Repaired copy of a whole HTML document (see HTMLRepairer)"""
+    repairer = HTMLRepairer()
+    return repairer.feed(html_content) + repairer.close()
+
+
+def iter_repaired(chunks, repairer=None):
+    """Incremental filter: yield repaired text for each input chunk
+
+    Args:
+        chunks (iterable): HTML text pieces
+        repairer (HTMLRepairer): Optional, to read its stats afterwards
+
+    Yields:
+        str: Repaired pieces (empty pieces are skipped)
+    """
+    repairer = repairer or HTMLRepairer()
+    for chunk in chunks:
+        piece = repairer.feed(chunk)
+        if piece:
+            yield piece
+    piece = repairer.close()
+    if piece:
+        yield piece
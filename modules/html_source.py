@@ -0,0 +1,242 @@
+"""
+HTML Source Module
+Memory-mapped reading of HTML exports
+
+The file is mapped instead of read, the first <table> is located on the
+raw bytes, and only the bytes from there on are decoded. UTF-8 is tried
+first, then cp1252 and latin-1 (older school servers emit those). Text
+comes out with universal newlines, the same as open(..., 'r').
+open_decoded serves the same text chunk by chunk to the file readers
+(fused pipeline, delta, database sink, LOAD DATA).
+"""
+import codecs
+import io
+import mmap
+import re
+from contextlib import contextmanager
+
+
+# Tried in order; latin-1 decodes any byte sequence
+SOURCE_ENCODINGS = ('utf-8', 'cp1252', 'latin-1')
+
+_TABLE_RE = re.compile(rb'<(/?)table(?=[\s/>])', re.IGNORECASE)
+
+# Table tags, plus constructs whose content is not (or not always) markup:
+# a table tag inside them must not be taken at face value
+_SCAN_RE = re.compile(
+    rb'<(/?)table(?=[\s/>])|<!--'
+    rb'|<(script|style|textarea|title|xmp|iframe|noembed|noframes|noscript)(?=[\s/>])'
+    rb'|<(plaintext)(?=[\s/>])',
+    re.IGNORECASE)
+
+_RAW_END = {}
+
+
+def _raw_end(name):
+    """Regex for the end of a comment / raw text element"""
+    if name not in _RAW_END:
+        _RAW_END[name] = re.compile(rb'-->' if name == b'!--' else rb'</' + name + rb'(?=[\s/>])',
+                                    re.IGNORECASE)
+    return _RAW_END[name]
+
+
+@contextmanager
+def open_mapped(path):
+    """Read-only mmap of a file (b'' for an empty file)"""
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            yield b''
+            return
+        try:
+            if hasattr(data, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+            yield data
+        finally:
+            data.close()
+
+
+def _inside_tag(data, pos):
+    """True if pos is inside a tag (e.g. an attribute value), not in text"""
+    return data.rfind(b'<', 0, pos) > data.rfind(b'>', 0, pos)
+
+
+def table_span(data):
+    """Byte range to parse: from the first '<table' to the end of file
+
+    The page header in front of the table (head, styles, navigation) is
+    never decoded. Falls back to the whole document whenever a table tag
+    sits inside a comment, raw text element or attribute value before
+    that point, where slicing could change how it parses. The tail is
+    kept: it is small, and finding the matching </table> would cost a
+    scan of the whole table.
+
+    Args:
+        data (bytes-like): Raw document (e.g. an mmap)
+
+    Returns:
+        tuple: (start, end) byte offsets
+    """
+    n = len(data)
+    pos = 0
+
+    while True:
+        m = _SCAN_RE.search(data, pos)
+        if m is None:
+            return 0, n  # No table: let the parser report it
+        if m.group(3) or _inside_tag(data, m.start()):
+            return 0, n
+
+        raw = b'!--' if m.group(0) == b'<!--' else m.group(2)
+        if raw:
+            end = _raw_end(raw.lower()).search(data, m.end())
+            if end is None or _TABLE_RE.search(data, m.end(), end.start()):
+                return 0, n
+            pos = end.end()
+        elif m.group(1):
+            pos = m.end()  # Stray </table> before any table
+        else:
+            return m.start(), n
+
+
+def _decoder(encoding):
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+
+
+def decode_span(data, start, end, encodings=SOURCE_ENCODINGS):
+    """Decode data[start:end] with the first encoding that fits
+
+    Returns:
+        tuple: (text, encoding)
+    """
+    for encoding in encodings:
+        try:
+            with memoryview(data)[start:end] as view:
+                return _decoder(encoding).decode(view, final=True), encoding
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError(encodings[-1], b'', start, end, "no encoding fits")
+
+
+def iter_decoded(data, start, end, encoding, chunk_size):
+    """Yield data[start:end] as text, decoding chunk_size bytes at a time
+
+    Raises UnicodeDecodeError while iterating if the encoding does not
+    fit; the caller restarts with the next one.
+    """
+    decoder = _decoder(encoding)
+    for pos in range(start, end, chunk_size):
+        with memoryview(data)[pos:min(pos + chunk_size, end)] as view:
+            piece = decoder.decode(view)
+        if piece:
+            yield piece
+    piece = decoder.decode(b'', final=True)
+    if piece:
+        yield piece
+
+
+def fitting_encoding(data, start, end, chunk_size, encodings=SOURCE_ENCODINGS):
+    """First encoding that decodes data[start:end], checked chunk by chunk"""
+    for encoding in encodings[:-1]:
+        try:
+            for _ in iter_decoded(data, start, end, encoding, chunk_size):
+                pass
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return encodings[-1]
+
+
+@contextmanager
+def open_decoded(path, chunk_size):
+    """Text chunks of a file from its first <table> on
+
+    For readers that consume rows as they go and can't restart on a
+    decode error: the encoding is settled with one decoding pass first
+    (see fitting_encoding), then the text is decoded chunk by chunk.
+
+    Yields:
+        tuple: (chunk iterator, encoding); iterate it inside the with
+    """
+    with open_mapped(path) as data:
+        start, end = table_span(data)
+        encoding = fitting_encoding(data, start, end, chunk_size)
+        yield iter_decoded(data, start, end, encoding, chunk_size), encoding
+
+
+# Row boundaries, and what makes a row range unsafe to parse on its own
+_TR_RE = re.compile(rb'<tr(?=[\s/>])', re.IGNORECASE)
+_UNSAFE_RE = re.compile(
+    rb'<!--|<(/?)(table|script|style|textarea|title|xmp|plaintext|iframe|noembed|noframes|noscript)(?=[\s/>])',
+    re.IGNORECASE)
+
+# A tag with '<' in an attribute value (title="<tr>"): a '<tr' found by
+# byte search may be inside it, so no cut is trusted around it
+_ATTR_LT_RE = re.compile(
+    rb'<[A-Za-z][^<>"\']*(?:(?:"[^"<]*"|\'[^\'<]*\')[^<>"\']*)*(?:"[^"<]*|\'[^\'<]*)?<')
+
+# Bytes searched per step when looking for a row boundary
+_WINDOW = 64 * 1024
+
+
+def _find_tr(data, pos, end):
+    """Offset of the next '<tr' in data[pos:end], -1 if there is none"""
+    while pos < end:
+        stop = min(pos + _WINDOW, end)
+        m = _TR_RE.search(data, pos, stop)
+        if m:
+            return m.start()
+        if stop == end:
+            break
+        pos = stop - 3  # A tag may straddle the window edge
+    return -1
+
+
+def plan_row_ranges(data, start, end, pieces):
+    """Split a table span into contiguous row ranges at '<tr' offsets
+
+    Args:
+        data (bytes-like): Raw document
+        start, end (int): Table span (see table_span)
+        pieces (int): Ranges wanted (fewer when rows run out)
+
+    Returns:
+        tuple or None: ((start, header_end), ranges): the header context
+        (from <table> to the first data row) and (start, end) byte
+        ranges covering all data rows. None when there are no data rows
+        or the header context holds comments, raw text, other tables or
+        '<' in an attribute value.
+    """
+    first = _find_tr(data, start, end)
+    header_end = _find_tr(data, first + 3, end) if first >= 0 else -1
+    if (header_end < 0 or _UNSAFE_RE.search(data, start + 1, header_end)
+            or _ATTR_LT_RE.search(data, start, header_end + 1)):
+        return None
+
+    size = (end - header_end) // pieces
+    cuts = [header_end]
+    for k in range(1, pieces):
+        pos = _find_tr(data, max(header_end + k * size, cuts[-1] + 3), end)
+        if pos < 0:
+            break
+        cuts.append(pos)
+    cuts.append(end)
+    return (start, header_end), list(zip(cuts, cuts[1:]))
+
+
+def plain_rows(data, start, end, last):
+    """True if data[start:end] can be parsed apart from its neighbours
+
+    A range must not contain comments, raw text elements or table tags
+    (nested or following tables); the last range may hold the closing
+    </table>, everything after it is ignored like in a full parse. No
+    tag may have '<' in an attribute value, including a tag still open
+    at the range end (its '<tr' cut would be part of the value).
+    """
+    m = _UNSAFE_RE.search(data, start, end)
+    if m is not None:
+        if not (last and m.group(1) == b'/' and m.group(2).lower() == b'table'):
+            return False
+        end = m.start()
+    return _ATTR_LT_RE.search(data, start, min(end + 1, len(data))) is None
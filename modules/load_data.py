@@ -0,0 +1,178 @@
+"""
+LOAD DATA Module
+Write a tab-separated data file plus the matching LOAD DATA [LOCAL] INFILE
+script, the fastest way to bulk-load psb_member into MySQL
+"""
+import os
+
+from .html_parser import STREAM_CHUNK_SIZE, _report_encoding, iter_table_rows, make_cell_cleaner
+from .html_source import open_decoded
+from .sql_generator_advance import (
+    WRITE_BUFFER_SIZE, classify_columns, compile_text_encoder, create_table_sql,
+    resolve_columns
+)
+
+
+# MySQL's default FIELDS ESCAPED BY '\\' rules (NULL would be \N, but
+# missing values are written as the column default instead)
+_TSV_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0',
+})
+
+
+def escape_field(text):
+    """Escape one value for LOAD DATA's default tab-separated format"""
+    return text.translate(_TSV_ESCAPES)
+
+
+def _sql_string(text):
+    """Quote a file path for the LOAD DATA statement"""
+    return "'" + text.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def load_data_sql(table_name, cols, infile, local=True):
+    """LOAD DATA statement matching the data file written by this module
+
+    Args:
+        table_name (str): Target table
+        cols (list): Column names, in data file order
+        infile (str): Data file path as the MySQL client/server sees it
+        local (bool): LOAD DATA LOCAL (file on the client machine)
+    """
+    cols_str = ', '.join([f'`{c}`' for c in cols])
+    return (
+        f"LOAD DATA {'LOCAL ' if local else ''}INFILE {_sql_string(infile)}\n"
+        f"INTO TABLE `{table_name}`\n"
+        f"CHARACTER SET utf8mb4\n"
+        f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'\n"
+        f"LINES TERMINATED BY '\\n'\n"
+        f"({cols_str});\n"
+    )
+
+
+def _write_load_data(headers, rows, data_file, sql_file, table_name, subdomain,
+                     local, include_create, clean=None):
+    """Shared writer: resolve columns, stream rows to the data file, write the script
+
+    Args:
+        headers (list): Header labels, without the injected subdomain
+        rows (iterable): Cell lists for the selected columns (None = skip)
+        clean (callable): Optional cell cleaner applied before encoding
+
+    Returns:
+        dict: Statistics
+    """
+    labels = (['subdomain'] if subdomain is not None else []) + list(headers)
+    _, cols, col_types = resolve_columns(labels)
+    encoders = [compile_text_encoder(t) for t in col_types]
+
+    # The injected subdomain is the same field on every line
+    lead = ''
+    if subdomain is not None:
+        lead = escape_field(encoders[0](subdomain)) + '\t'
+        encoders = encoders[1:]
+
+    count = 0
+    buffer = []
+    buffered = 0
+    with open(data_file, 'w', encoding='utf-8', newline='') as f:
+        for cells in rows:
+            if cells is None:
+                continue
+            if clean is not None:
+                cells = [clean(c) for c in cells]
+            line = lead + '\t'.join([escape_field(enc(c)) for enc, c in zip(encoders, cells)]) + '\n'
+            buffer.append(line)
+            buffered += len(line)
+            count += 1
+            if buffered >= WRITE_BUFFER_SIZE:
+                f.write(''.join(buffer))
+                buffer = []
+                buffered = 0
+        f.write(''.join(buffer))
+
+    with open(sql_file, 'w', encoding='utf-8') as f:
+        if include_create:
+            f.write(create_table_sql(table_name, cols, col_types))
+        f.write(load_data_sql(table_name, cols, data_file, local))
+
+    size = os.path.getsize(data_file)
+    print(f"✅ Data saved to: {data_file} ({count} rows, {size:,} bytes)")
+    print(f"✅ LOAD DATA script saved to: {sql_file}")
+    return {'rows': count, 'columns': len(cols), 'bytes': size,
+            'data_file': data_file, 'sql_file': sql_file}
+
+
+def _sql_file_for(data_file):
+    """Default companion script name: psb_member.tsv → psb_member.sql"""
+    return os.path.splitext(data_file)[0] + '.sql'
+
+
+def save_load_data(df, data_file="psb_member.tsv", subdomain=None, table_name="psb_member",
+                   sql_file=None, local=True, include_create=True):
+    """Write a parsed DataFrame as LOAD DATA input
+
+    Args:
+        df (pd.DataFrame): Parsed data (from parse_html_table)
+        data_file (str): Tab-separated output file
+        subdomain (str): Injected as the first `subdomain` column, like
+            main.py's df.insert; None to use the columns as they are
+        table_name (str): Target table
+        sql_file (str): Companion script (default: data_file with .sql)
+        local (bool): Emit LOAD DATA LOCAL INFILE
+        include_create (bool): Put CREATE TABLE before LOAD DATA
+
+    Returns:
+        dict or None: Statistics on success
+    """
+    try:
+        offset = 1 if subdomain is not None else 0
+        labels = (['subdomain'] if offset else []) + list(df.columns)
+        indices = [i - offset for i in classify_columns(labels)[0] if i >= offset]
+        selected = df.iloc[:, indices]
+        rows = (list(row) for row in selected.itertuples(index=False, name=None))
+        return _write_load_data(list(df.columns), rows, data_file, sql_file or _sql_file_for(data_file),
+                                table_name, subdomain, local, include_create)
+    except Exception as e:
+        print(f"❌ Error saving LOAD DATA files: {e}")
+        return None
+
+
+def html_to_load_data(html_file, data_file="psb_member.tsv", subdomain=None,
+                      table_name="psb_member", sql_file=None, local=True,
+                      include_create=True, cleaning=None):
+    """Stream an HTML export straight into LOAD DATA input, no DataFrame
+
+    Args:
+        html_file (str): Input export
+        cleaning (dict): Cell cleaning overrides, see parse_html_table
+        Others: See save_load_data
+
+    Returns:
+        dict or None: Statistics on success
+    """
+    offset = 1 if subdomain is not None else 0
+
+    def select(headers):
+        labels = (['subdomain'] if offset else []) + list(headers)
+        return [i - offset for i in classify_columns(labels)[0] if i >= offset]
+
+    try:
+        with open_decoded(html_file, STREAM_CHUNK_SIZE) as (chunks, encoding):
+            _report_encoding(encoding)
+            rows = iter_table_rows(chunks, select)
+            headers = next(rows, None)
+            if not headers:
+                print("❌ No table headers found in HTML")
+                return None
+            return _write_load_data(headers, rows, data_file,
+                                    sql_file or _sql_file_for(data_file), table_name,
+                                    subdomain, local, include_create,
+                                    clean=make_cell_cleaner(cleaning))
+    except Exception as e:
+        print(f"❌ Error saving LOAD DATA files: {e}")
+        return None
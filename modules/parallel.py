@@ -0,0 +1,41 @@
+"""
+Parallel Helpers
+Ordered process-pool map with a bounded number of tasks in flight
+"""
+import os
+from collections import deque
+
+
+def default_workers():
+    """Number of worker processes to use when none is given"""
+    return os.cpu_count() or 1
+
+
+def imap_ordered(func, items, workers, window=None, args=()):
+    """Map func over items in worker processes, yielding results in order
+    
+    At most ``window`` tasks (default: 2 per worker) are submitted ahead
+    of the consumer, so neither pending inputs nor finished results pile
+    up in memory when the producer or the consumer is slower.
+    
+    Args:
+        func (callable): Top-level (picklable) function
+        items (iterable): First argument for each call
+        workers (int): Worker processes
+        window (int): Maximum tasks in flight
+        args (tuple): Extra arguments passed to every call
+        
+    Yields:
+        Results of func(item, *args), in input order
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    window = window or workers * 2
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for item in items:
+            pending.append(pool.submit(func, item, *args))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
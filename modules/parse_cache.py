@@ -0,0 +1,160 @@
+"""
+Parse Cache Module
+On-disk cache of parsed tables, keyed by a hash of the HTML content
+
+Re-running the same export (preview, other subdomain, other output file)
+loads the cleaned DataFrame instead of fixing and parsing the HTML again.
+Entries are pickled with protocol 5 and evicted least-recently-used once
+the directory grows past its size limit.
+
+Environment:
+    HTML_TO_SQL_CACHE_DIR     Cache directory (default: ~/.cache/html_to_sql_generator)
+    HTML_TO_SQL_CACHE_MAX_MB  Size limit in MB (default: 512), 0 disables the cache
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+
+# Bump when the entry layout changes; parser changes bump PARSER_VERSION
+PARSE_CACHE_VERSION = 1
+
+DEFAULT_CACHE_MAX_MB = 512
+CACHE_SUFFIX = '.pkl'
+
+
+def cache_dir():
+    """Cache directory from HTML_TO_SQL_CACHE_DIR or the user cache folder"""
+    return os.environ.get('HTML_TO_SQL_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'html_to_sql_generator')
+
+
+def cache_max_bytes():
+    """Size limit from HTML_TO_SQL_CACHE_MAX_MB (0 = cache disabled)"""
+    try:
+        mb = float(os.environ.get('HTML_TO_SQL_CACHE_MAX_MB', DEFAULT_CACHE_MAX_MB))
+    except ValueError:
+        mb = DEFAULT_CACHE_MAX_MB
+    return int(mb * 1024 * 1024)
+
+
+def text_digest(text):
+    """SHA-256 of an HTML string"""
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def data_digest(data):
+    """SHA-256 of raw bytes (bytes, mmap, ...), equal to file_digest of that file"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes, read in blocks"""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def make_key(digest, **options):
+    """Cache key for a content digest and the options that shape the result
+
+    Args:
+        digest (str): text_digest / file_digest of the input
+        **options: Parser version, backend, cleaning rules, column
+            selection, ... (must have a stable repr)
+
+    Returns:
+        str: Hex key, used as file name
+    """
+    opts = repr(sorted(options.items()))
+    return hashlib.sha256(f"{PARSE_CACHE_VERSION}|{digest}|{opts}".encode('utf-8')).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(cache_dir(), key + CACHE_SUFFIX)
+
+
+def load(key):
+    """Cached DataFrame for key, or None on a miss
+
+    A hit refreshes the entry's modification time, which is what the
+    LRU eviction orders by.
+    """
+    if not cache_max_bytes():
+        return None
+    path = _entry_path(key)
+    try:
+        with open(path, 'rb') as f:
+            df = pickle.load(f)
+        os.utime(path)
+        return df
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Truncated or incompatible entry: drop it and parse again
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def store(key, df):
+    """Write df under key (atomically), then evict down to the size limit"""
+    max_bytes = cache_max_bytes()
+    if not max_bytes or df is None:
+        return
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(df, f, protocol=5)
+            os.replace(tmp, _entry_path(key))
+        except BaseException:
+            os.remove(tmp)
+            raise
+        evict(max_bytes)
+    except OSError as e:
+        print(f"⚠️  Parse cache not written: {e}")
+
+
+def evict(max_bytes=None):
+    """Delete least-recently-used entries until the cache fits max_bytes
+
+    Returns:
+        int: Number of entries removed
+    """
+    max_bytes = cache_max_bytes() if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    try:
+        with os.scandir(cache_dir()) as it:
+            for entry in it:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+    except FileNotFoundError:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+        total -= size
+    return removed
+
+
+def clear_cache():
+    """Remove every cache entry
+
+    Returns:
+        int: Number of entries removed
+    """
+    return evict(0)
@@ -0,0 +1,151 @@
+"""
+Fused Pipeline Module
+HTML rows → SQL literals → INSERT statements, without a DataFrame
+
+The DataFrame path (parse_html_table + generate_sql_advanced) stays
+available for previews; this path is for bulk conversion. Rows come
+from the same backends as parse_html_table (export fast path, lxml,
+BeautifulSoup), and each <td> is cleaned and encoded as soon as its row
+is read, so every cell is materialized once as text and once as its
+SQL literal.
+"""
+import os
+
+from .html_parser import STREAM_CHUNK_SIZE, _html_rows, _report_encoding, iter_table_rows, make_cell_cleaner
+from .html_source import open_decoded
+from .sql_generator_advance import (
+    DEFAULT_MAX_ALLOWED_PACKET, ENCODE_CHUNK_ROWS, FAST_IMPORT_COMMIT_ROWS, classify_columns,
+    compile_column_encoders, create_table_sql, file_pieces, group_inserts, insert_prefix, resolve_columns,
+    save_sql_stream
+)
+
+
+def _with_subdomain(headers, subdomain):
+    """Header labels as generate_sql_advanced sees them after main.py's insert"""
+    return ['subdomain'] + list(headers) if subdomain is not None else list(headers)
+
+
+def iter_html_sql(chunks, subdomain=None, table_name="psb_member", rows_per_insert=1,
+                  max_statement_bytes=DEFAULT_MAX_ALLOWED_PACKET, include_create=True,
+                  cleaning=None, stats=None, fast_import=False,
+                  commit_rows=FAST_IMPORT_COMMIT_ROWS, backend='auto', streaming=False):
+    """Convert an HTML export straight into SQL file pieces
+
+    Produces the same text as parse_html_table (with the same backend /
+    streaming) → df.insert(0, 'subdomain', subdomain) → iter_sql_advanced,
+    without building the DataFrame.
+
+    Args:
+        chunks (iterable): HTML text pieces (e.g. file blocks)
+        subdomain (str): Value injected as the first `subdomain` column,
+            None to leave the export's columns as they are
+        table_name (str): Target table
+        rows_per_insert (int): Rows per INSERT statement
+        max_statement_bytes (int): Byte cap per extended INSERT
+        include_create (bool): Yield the CREATE TABLE statement first
+        cleaning (dict): Cell cleaning overrides, see parse_html_table
+        stats (dict): Optional, receives 'rows' and 'columns' counts
+        fast_import (bool): Wrap the INSERTs in import tuning, see
+            iter_sql_advanced
+        commit_rows (int): Rows between COMMITs when fast_import is on
+        backend (str): Parser backend, see parse_html_table
+        streaming (bool): Read rows with the streaming parser instead,
+            one chunk at a time (memory bounded by one row, but slower,
+            and a table nested in a cell ends the outer row early)
+
+    Yields:
+        str: SQL pieces, see iter_sql_advanced
+    """
+    offset = 1 if subdomain is not None else 0
+
+    def select(headers):
+        indices = classify_columns(_with_subdomain(headers, subdomain))[0]
+        return [i - offset for i in indices if i >= offset]
+
+    if streaming:
+        rows = iter_table_rows(chunks, select)
+    else:
+        try:
+            rows = _html_rows(''.join(chunks), backend, select)[1]
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+    headers = next(rows, None)
+    if headers is None:
+        print("❌ No <table> found in HTML")
+        return
+    if not headers:
+        print("❌ No headers (<th>) found in table")
+        return
+
+    print(f"\n🔧 Generating SQL for table: {table_name}")
+    print(f"📊 Found {len(headers)} columns\n")
+    _, cols, col_types = resolve_columns(_with_subdomain(headers, subdomain))
+
+    encoders = compile_column_encoders(col_types)
+    clean = make_cell_cleaner(cleaning)
+    prefix = insert_prefix(table_name, cols)
+
+    # The injected subdomain is the same literal on every row
+    if offset:
+        lead = '(' + encoders[0](subdomain) + ', '
+        encoders = encoders[1:]
+    else:
+        lead = '('
+
+    if stats is not None:
+        stats.update(rows=0, columns=len(cols))
+
+    def statements():
+        count = 0
+        values = []
+        for cells in rows:
+            if cells is None:
+                continue
+            values.append(lead + ', '.join([enc(clean(c)) for enc, c in zip(encoders, cells)]) + ')')
+            # Same grouping boundaries as iter_sql_advanced's chunks
+            if len(values) == ENCODE_CHUNK_ROWS:
+                count += len(values)
+                yield from group_inserts(values, prefix, rows_per_insert, max_statement_bytes)[0]
+                values = []
+                print(f"  ✓ Encoded {count} rows...")
+        if values:
+            count += len(values)
+            yield from group_inserts(values, prefix, rows_per_insert, max_statement_bytes)[0]
+        if stats is not None:
+            stats['rows'] = count
+
+    create = create_table_sql(table_name, cols, col_types) if include_create else None
+    yield from file_pieces(create, statements(), table_name if fast_import else None, commit_rows)
+
+
+def convert_html_file(html_file, outfile, subdomain=None, chunk_size=STREAM_CHUNK_SIZE, **options):
+    """Stream an HTML export file into a .sql file
+
+    Args:
+        html_file (str): Input export
+        outfile (str): Output .sql file
+        subdomain (str): Injected subdomain, see iter_html_sql
+        chunk_size (int): Bytes decoded per block
+        **options: Passed to iter_html_sql
+
+    Returns:
+        dict or None: {'rows', 'columns', 'statements', 'bytes'} on success
+    """
+    stats = {'rows': 0, 'columns': 0}
+    try:
+        with open_decoded(html_file, chunk_size) as (chunks, encoding):
+            _report_encoding(encoding)
+            pieces = iter_html_sql(chunks, subdomain=subdomain, stats=stats, **options)
+            saved = save_sql_stream(pieces, outfile)
+    except Exception as e:
+        print(f"❌ Error reading file: {e}")
+        return None
+
+    if not saved:
+        return None
+    if not stats['columns']:
+        os.remove(outfile)  # No usable table, don't leave an empty file
+        return None
+    stats.update(saved)
+    return stats
@@ -3,10 +3,27 @@ Advanced SQL Generator - Complete psb_member table structure
 Matches all 268 columns from the original table
 Only accepts valid columns, skips unknown columns
 """
-import pandas as pd
-import numpy as np
+import os
 import re
+import sys
 from datetime import datetime
+from functools import lru_cache
+
+from .parallel import imap_ordered
+
+
+# Default byte cap for one extended INSERT (MySQL 5.6 max_allowed_packet)
+DEFAULT_MAX_ALLOWED_PACKET = 1024 * 1024
+
+# Rows encoded per step, and characters buffered per file write
+ENCODE_CHUNK_ROWS = 10000
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Below this many rows parallel encoding falls back to one process
+PARALLEL_MIN_ROWS = 20000
+
+# Rows between COMMITs in fast-import mode
+FAST_IMPORT_COMMIT_ROWS = 50000
 
 
 # Valid columns in psb_member table (for validation)
@@ -474,65 +491,257 @@ def get_column_type(col_name):
     return "VARCHAR(255) NOT NULL DEFAULT ''"
 
 
-def escape_value(val, col_type):
-    """Escape value based on column type"""
-    # Handle Series
-    if isinstance(val, pd.Series):
-        if len(val) == 0:
-            return get_default_value(col_type)
-        val = val.iloc[0]
-    
-    # Handle None/NaN
-    if val is None or (isinstance(val, float) and np.isnan(val)):
-        return get_default_value(col_type)
-    
-    try:
-        if pd.isna(val):
-            return get_default_value(col_type)
-    except:
-        pass
+def column_kind(col_type):
+    """Classify a column type the way values are encoded for it
     
-    # Convert to string
-    s = str(val).strip()
-    if s == '' or s == 'nan' or s == 'None':
-        return get_default_value(col_type)
-    
-    # Handle by type
+    Returns:
+        str: 'int', 'decimal', 'date', 'enum' or 'string'
+    """
+    # Order matters: DATETIME is handled as DATE
     if 'INT' in col_type:
+        return 'int'
+    elif 'DECIMAL' in col_type:
+        return 'decimal'
+    elif 'DATE' in col_type:
+        return 'date'
+    elif 'ENUM' in col_type:
+        return 'enum'
+    return 'string'
+
+
+def enum_values(col_type):
+    """Allowed values of an ENUM(...) column type"""
+    match = re.search(r"ENUM\((.*?)\)", col_type)
+    if not match:
+        return frozenset()
+    return frozenset(v.strip("'") for v in match.group(1).split(','))
+
+
+def _cell_text(val):
+    """Stripped text of a cell, or None when it should get the default"""
+    if type(val) is str:
+        s = val.strip()
+    else:
+        # Series / pd.NA / NaT can only show up once pandas is loaded
+        pd = sys.modules.get('pandas')
+        
+        # Handle Series
+        if pd is not None and isinstance(val, pd.Series):
+            if len(val) == 0:
+                return None
+            val = val.iloc[0]
+        
+        # Handle None/NaN
+        if val is None or (isinstance(val, float) and val != val):
+            return None
+        
         try:
-            return str(int(float(s)))
+            if pd is not None and pd.isna(val):
+                return None
         except:
-            return get_default_value(col_type)
+            pass
+        
+        s = str(val).strip()
     
-    elif 'DECIMAL' in col_type:
+    if s == '' or s == 'nan' or s == 'None':
+        return None
+    return s
+
+
+@lru_cache(maxsize=None)
+def compile_encoder(col_type):
+    """Build the value encoder for one column type
+    
+    Type dispatch, the default literal and the ENUM value set are resolved
+    once here, so encoding a cell is a single call.
+    
+    Returns:
+        callable: encoder(val) -> SQL literal
+    """
+    kind = column_kind(col_type)
+    default = get_default_value(col_type)
+    
+    if kind == 'int':
+        def encode(val):
+            s = _cell_text(val)
+            if s is None:
+                return default
+            try:
+                return str(int(float(s)))
+            except (ValueError, OverflowError):
+                return default
+    
+    elif kind == 'decimal':
+        def encode(val):
+            s = _cell_text(val)
+            if s is None:
+                return default
+            try:
+                return str(float(s))
+            except ValueError:
+                return default
+    
+    elif kind == 'date':
+        def encode(val):
+            s = _cell_text(val)
+            if s is None:
+                return default
+            # Remove time if exists ('0000-00-00 00:00:00' -> '0000-00-00')
+            return "'" + s.split(' ')[0] + "'"
+    
+    elif kind == 'enum':
+        valid = enum_values(col_type)
+        
+        def encode(val):
+            s = _cell_text(val)
+            if s is None or s not in valid:
+                return default
+            return "'" + s + "'"
+    
+    else:
+        def encode(val):
+            s = _cell_text(val)
+            if s is None:
+                return default
+            # String - escape quotes
+            return "'" + s.replace("'", "''").replace("\\", "\\\\") + "'"
+    
+    return encode
+
+
+def _unquote_literal(lit):
+    return lit[1:-1] if lit[:1] == "'" else lit
+
+
+def _unescape_literal(lit):
+    # Inverse of the string encoder: \\ → \ and '' → '
+    return lit[1:-1].replace("\\\\", "\\").replace("''", "'")
+
+
+@lru_cache(maxsize=None)
+def compile_text_encoder(col_type):
+    """Build an encoder that returns the stored value as plain text
+    
+    Same normalization and defaults as compile_encoder, without SQL
+    quoting/escaping (for data files and driver parameters).
+    
+    Returns:
+        callable: encoder(val) -> str
+    """
+    encode = compile_encoder(col_type)
+    kind = column_kind(col_type)
+    
+    if kind in ('int', 'decimal'):
+        return encode
+    
+    unquote = _unescape_literal if kind == 'string' else _unquote_literal
+    
+    def encode_text(val):
+        return unquote(encode(val))
+    
+    return encode_text
+
+
+def compile_column_encoders(col_types):
+    """Compile a schema (list of column types) into per-column encoders"""
+    return [compile_encoder(col_type) for col_type in col_types]
+
+
+def _scalar_fill(out, col, mask, encode):
+    """Encode the cells selected by mask one by one (rare fallback)"""
+    if mask.any():
+        out[mask] = [encode(v) for v in col[mask]]
+
+
+def encode_column(col, col_type):
+    """Encode a whole column into SQL literals at once
+    
+    Vectorized counterpart of escape_value. Cells the vectorized rules
+    cannot decide exactly (non-string objects, numbers that only Python's
+    float() accepts, out-of-range values) go through the scalar encoder,
+    so the output is identical to escape_value cell by cell.
+    
+    Args:
+        col (pd.Series): Column values
+        col_type (str): Column type from get_column_type
+        
+    Returns:
+        np.ndarray: SQL literal per cell (object dtype)
+    """
+    import numpy as np
+    import pandas as pd
+    
+    encode = compile_encoder(col_type)
+    default = get_default_value(col_type)
+    col = col.reset_index(drop=True)
+    
+    if pd.api.types.infer_dtype(col, skipna=True) not in ('string', 'empty'):
+        return np.array([encode(v) for v in col], dtype=object)
+    
+    text = col.astype(object).str.strip()
+    empty = (col.isna() | text.isin(['', 'nan', 'None'])).to_numpy()
+    out = np.full(len(col), default, dtype=object)
+    kind = column_kind(col_type)
+    
+    if kind in ('int', 'decimal'):
+        # to_numeric only decides which cells parse; the values themselves
+        # come from float() semantics via astype
+        parsed = pd.to_numeric(text.where(~empty), errors='coerce').notna().to_numpy(copy=True)
         try:
-            return str(float(s))
-        except:
-            return get_default_value(col_type)
+            nums = text[parsed].astype('float64').to_numpy()
+        except ValueError:
+            return np.array([encode(v) for v in col], dtype=object)
+        
+        if kind == 'int':
+            exact = np.isfinite(nums) & (np.abs(nums) < 2.0 ** 63)
+            idx = np.flatnonzero(parsed)
+            out[idx[exact]] = nums[exact].astype(np.int64).astype(str).astype(object)
+            parsed[idx[~exact]] = False
+        else:
+            out[parsed] = pd.Series(nums).astype(str).to_numpy(dtype=object)
+        _scalar_fill(out, col, ~empty & ~parsed, encode)
     
-    elif 'DATE' in col_type:
-        if s == '0000-00-00' or s == '0000-00-00 00:00:00':
-            return "'0000-00-00'"
-        # Remove time if exists
-        s = s.split(' ')[0]
-        return f"'{s}'"
+    elif kind == 'date':
+        ok = ~empty
+        out[ok] = ("'" + text[ok].str.split(' ', n=1).str[0] + "'").to_numpy(dtype=object)
     
-    elif 'ENUM' in col_type:
-        # Extract valid values from ENUM definition
-        match = re.search(r"ENUM\((.*?)\)", col_type)
-        if match:
-            valid = [v.strip("'") for v in match.group(1).split(',')]
-            if s in valid:
-                return f"'{s}'"
-        return get_default_value(col_type)
+    elif kind == 'enum':
+        ok = ~empty & text.isin(enum_values(col_type)).to_numpy()
+        out[ok] = ("'" + text[ok] + "'").to_numpy(dtype=object)
     
     else:
-        # String - escape quotes
-        s = s.replace("'", "''")
-        s = s.replace("\\", "\\\\")
-        return f"'{s}'"
+        ok = ~empty
+        escaped = text[ok].str.replace("'", "''", regex=False)
+        escaped = escaped.str.replace("\\", "\\\\", regex=False)
+        out[ok] = ("'" + escaped + "'").to_numpy(dtype=object)
+    
+    return out
+
+
+def encode_rows(df, col_types):
+    """Encode a DataFrame column by column into VALUES tuples
+    
+    Returns:
+        list: One '(v1, v2, ...)' string per row
+    """
+    import pandas as pd
+    
+    if len(df) == 0:
+        return []
+    columns = [pd.Series(encode_column(df.iloc[:, i], t))
+               for i, t in enumerate(col_types)]
+    if not columns:
+        return ['()'] * len(df)
+    joined = columns[0].str.cat(columns[1:], sep=', ')
+    return ('(' + joined + ')').tolist()
+
+
+def escape_value(val, col_type):
+    """Escape value based on column type"""
+    return compile_encoder(col_type)(val)
 
 
+@lru_cache(maxsize=None)
 def get_default_value(col_type):
     """Get default value for NULL fields"""
     if 'INT' in col_type:
@@ -553,16 +762,20 @@ def get_default_value(col_type):
         return "''"
 
 
-def generate_sql_advanced(df, table_name="psb_member"):
-    """Generate SQL matching psb_member structure"""
-    print(f"\n🔧 Generating SQL for table: {table_name}")
-    print(f"📊 DataFrame: {len(df)} rows × {len(df.columns)} columns\n")
+def _multi_insert(prefix, batch):
+    """Join VALUES tuples into one extended INSERT statement"""
+    return prefix + ',\n'.join(batch) + ';\n'
+
+
+def classify_columns(headers):
+    """Split headers into valid (first occurrence), unknown and duplicate
     
+    Returns:
+        tuple: (valid indices, valid names, skipped names, duplicate names)
+    """
     # Sanitize column names
-    cols = [sanitize_column_name(c) for c in df.columns]
+    cols = [sanitize_column_name(c) for c in headers]
     
-    # Filter: Only keep columns that exist in VALID_COLUMNS
-    print("🔍 Filtering columns...")
     valid_cols = []
     valid_indices = []
     skipped_cols = []
@@ -582,6 +795,28 @@ def generate_sql_advanced(df, table_name="psb_member"):
         else:
             skipped_cols.append(col)
     
+    return valid_indices, valid_cols, skipped_cols, duplicate_cols
+
+
+def select_valid_columns(headers):
+    """Indices of the headers generate_sql_advanced keeps
+    
+    Pass as ``columns=`` to the HTML parser so cells of unknown and
+    duplicate columns are never extracted.
+    """
+    return classify_columns(headers)[0]
+
+
+def resolve_columns(headers):
+    """Report and resolve the valid, first-seen psb_member columns
+    
+    Returns:
+        tuple: (valid indices, column names, column types)
+    """
+    # Filter: Only keep columns that exist in VALID_COLUMNS
+    print("🔍 Filtering columns...")
+    valid_indices, valid_cols, skipped_cols, duplicate_cols = classify_columns(headers)
+    
     if duplicate_cols:
         print(f"⚠️  Removed {len(duplicate_cols)} duplicate columns:")
         for col in set(duplicate_cols):  # Show unique duplicates
@@ -596,12 +831,27 @@ def generate_sql_advanced(df, table_name="psb_member"):
     
     print(f"✅ Using {len(valid_cols)} valid columns\n")
     
-    # Filter DataFrame to only valid columns
-    df = df.iloc[:, valid_indices]
-    cols = valid_cols
-    col_types = [get_column_type(c) for c in cols]
+    col_types = [get_column_type(c) for c in valid_cols]
+    return valid_indices, valid_cols, col_types
+
+
+def _resolve_columns(df, table_name):
+    """Report and keep only valid, first-seen psb_member columns
     
-    # CREATE TABLE statement
+    Returns:
+        tuple: (filtered DataFrame, column names, column types)
+    """
+    print(f"\n🔧 Generating SQL for table: {table_name}")
+    print(f"📊 DataFrame: {len(df)} rows × {len(df.columns)} columns\n")
+    
+    valid_indices, cols, col_types = resolve_columns(df.columns)
+    
+    # Filter DataFrame to only valid columns
+    return df.iloc[:, valid_indices], cols, col_types
+
+
+def create_table_sql(table_name, cols, col_types):
+    """CREATE TABLE statement for the resolved columns"""
     create = f"CREATE TABLE IF NOT EXISTS `{table_name}` (\n"
     create += "  `no` INT(11) NOT NULL AUTO_INCREMENT,\n"
     
@@ -612,23 +862,219 @@ def generate_sql_advanced(df, table_name="psb_member"):
     create += "  PRIMARY KEY (`no`),\n"
     create += "  KEY `subdomain` (`subdomain`)\n"
     create += ") ENGINE=MyISAM DEFAULT CHARSET=latin1;\n\n"
+    return create
+
+
+def insert_prefix(table_name, cols):
+    """'INSERT INTO `table` (`a`, `b`) VALUES ' for the resolved columns"""
+    cols_str = ', '.join([f'`{c}`' for c in cols])
+    return f"INSERT INTO `{table_name}` ({cols_str}) VALUES "
+
+
+def group_inserts(rows, prefix, rows_per_insert, max_statement_bytes):
+    """Group encoded VALUES tuples into INSERT statements
     
-    # INSERT statements
+    Returns:
+        tuple: (list of statements, rows larger than the byte cap)
+    """
+    if rows_per_insert <= 1:
+        return [f"{prefix}{vals_str};\n" for vals_str in rows], 0
+    
+    prefix_bytes = len(prefix.encode('utf-8'))
     inserts = []
-    for idx, row in enumerate(df.itertuples(index=False), 1):
-        values = []
-        for i, cell in enumerate(row):
-            col_type = col_types[i]
-            values.append(escape_value(cell, col_type))
-        
-        cols_str = ', '.join([f'`{c}`' for c in cols])
-        vals_str = ', '.join(values)
-        sql = f"INSERT INTO `{table_name}` ({cols_str}) VALUES ({vals_str});\n"
-        inserts.append(sql)
+    batch = []
+    batch_bytes = prefix_bytes
+    oversized = 0
+    
+    for vals_str in rows:
+        # +2 for the ",\n" separator or the closing ";\n"
+        size = len(vals_str.encode('utf-8')) + 2
+        if batch and (len(batch) >= rows_per_insert
+                      or batch_bytes + size > max_statement_bytes):
+            inserts.append(_multi_insert(prefix, batch))
+            batch = []
+            batch_bytes = prefix_bytes
+        if prefix_bytes + size > max_statement_bytes:
+            oversized += 1
+        batch.append(vals_str)
+        batch_bytes += size
+    
+    if batch:
+        inserts.append(_multi_insert(prefix, batch))
+    
+    return inserts, oversized
+
+
+def _chunk_inserts(chunk, prefix, col_types, rows_per_insert, max_statement_bytes):
+    """Encode one row chunk into its INSERT statements (worker entry point)"""
+    return group_inserts(encode_rows(chunk, col_types), prefix,
+                              rows_per_insert, max_statement_bytes)
+
+
+def _iter_inserts(df, table_name, cols, col_types, rows_per_insert,
+                  max_statement_bytes, chunk_rows, workers=1):
+    """Encode df chunk by chunk and yield its INSERT statements"""
+    prefix = insert_prefix(table_name, cols)
+    total = len(df)
+    oversized = 0
+    
+    chunks = (df.iloc[start:start + chunk_rows] for start in range(0, total, chunk_rows))
+    args = (prefix, col_types, rows_per_insert, max_statement_bytes)
+    
+    # Small inputs are not worth the process start-up and IPC
+    if workers > 1 and total >= PARALLEL_MIN_ROWS:
+        print(f"⚡ Encoding with {workers} worker processes")
+        results = imap_ordered(_chunk_inserts, chunks, workers, args=args)
+    else:
+        results = (_chunk_inserts(chunk, *args) for chunk in chunks)
+    
+    done = 0
+    for inserts, big in results:
+        oversized += big
+        yield from inserts
         
         # Progress indicator
-        if idx % 50 == 0:
-            print(f"  ✓ Generated {idx}/{len(df)} INSERT statements...")
+        done = min(done + chunk_rows, total)
+        print(f"  ✓ Encoded {done}/{total} rows...")
+    
+    if oversized:
+        print(f"⚠️  {oversized} rows exceed {max_statement_bytes:,} bytes on their own")
+
+
+def iter_sql_advanced(df, table_name="psb_member", rows_per_insert=1,
+                      max_statement_bytes=DEFAULT_MAX_ALLOWED_PACKET,
+                      include_create=True, chunk_rows=ENCODE_CHUNK_ROWS, workers=1,
+                      fast_import=False, commit_rows=FAST_IMPORT_COMMIT_ROWS):
+    """Yield the SQL file piece by piece
+    
+    Rows are encoded ``chunk_rows`` at a time, so memory does not grow
+    with the row count. Concatenating the pieces gives the same text as
+    ``generate_sql_advanced(...)['full_sql']`` (or the joined inserts
+    when ``include_create`` is False).
+    
+    Args:
+        df (pd.DataFrame): Parsed data
+        table_name (str): Target table
+        rows_per_insert (int): See generate_sql_advanced
+        max_statement_bytes (int): See generate_sql_advanced
+        include_create (bool): Yield the CREATE TABLE statement first
+        chunk_rows (int): Rows encoded per step
+        workers (int): Encode chunks in this many processes; output order
+            is kept. Inputs under PARALLEL_MIN_ROWS stay single-process
+        fast_import (bool): Wrap the INSERTs in import tuning (deferred
+            keys, checks off, batched COMMITs), see fast_import_sql
+        commit_rows (int): Rows between COMMITs when fast_import is on
+        
+    Yields:
+        str: CREATE TABLE, then one INSERT statement per piece
+    """
+    df, cols, col_types = _resolve_columns(df, table_name)
+    
+    create = create_table_sql(table_name, cols, col_types) if include_create else None
+    statements = _iter_inserts(df, table_name, cols, col_types, rows_per_insert,
+                               max_statement_bytes, chunk_rows, workers)
+    yield from file_pieces(create, statements, table_name if fast_import else None, commit_rows)
+
+
+def fast_import_sql(table_name):
+    """Session tuning wrapped around the INSERT statements of a bulk import
+    
+    Index maintenance is deferred (DISABLE KEYS rebuilds the non-unique
+    MyISAM indexes once at ENABLE KEYS), unique/foreign key checks are
+    off and rows are committed in batches. The previous session values
+    are saved in user variables and restored by the postamble.
+    
+    Args:
+        table_name (str): Target table
+        
+    Returns:
+        tuple: (preamble, postamble)
+    """
+    preamble = (
+        "SET @OLD_UNIQUE_CHECKS=@@UNIQUE_CHECKS, UNIQUE_CHECKS=0;\n"
+        "SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0;\n"
+        "SET @OLD_AUTOCOMMIT=@@AUTOCOMMIT, AUTOCOMMIT=0;\n"
+        f"ALTER TABLE `{table_name}` DISABLE KEYS;\n"
+    )
+    postamble = (
+        "COMMIT;\n"
+        f"ALTER TABLE `{table_name}` ENABLE KEYS;\n"
+        "SET AUTOCOMMIT=@OLD_AUTOCOMMIT;\n"
+        "SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS;\n"
+        "SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS;\n"
+    )
+    return preamble, postamble
+
+
+def statement_rows(sql):
+    """Rows in an INSERT statement built by group_inserts
+    
+    Counts the ``),\\n(`` tuple separators, so a string value containing
+    that exact sequence is counted twice; good enough for COMMIT pacing.
+    """
+    return sql.count('),\n(') + 1
+
+
+def file_pieces(create, statements, fast_import_table=None, commit_rows=FAST_IMPORT_COMMIT_ROWS):
+    """Lay out CREATE TABLE and INSERT statements as file pieces
+    
+    Uses the same separators as ``create + '\\n'.join(inserts)`` and
+    reports the statement count once the input is exhausted.
+    
+    Args:
+        create (str): CREATE TABLE statement, or None to leave it out
+        statements (iterable): INSERT statements
+        fast_import_table (str): Wrap the statements in fast_import_sql
+            for this table and COMMIT every ``commit_rows`` rows; None
+            (default) for plain statements
+        commit_rows (int): Rows between COMMITs in fast-import mode
+    """
+    if create:
+        yield create
+    
+    if fast_import_table:
+        preamble, postamble = fast_import_sql(fast_import_table)
+        yield preamble
+    
+    count = 0
+    pending = 0
+    for sql in statements:
+        yield sql if count == 0 and not fast_import_table else '\n' + sql
+        count += 1
+        
+        if fast_import_table and commit_rows:
+            pending += statement_rows(sql)
+            if pending >= commit_rows:
+                yield '\nCOMMIT;\n'
+                pending = 0
+    
+    if fast_import_table:
+        yield '\n' + postamble
+    
+    print(f"\n✅ Done! Generated {count} INSERT statements\n")
+
+
+def generate_sql_advanced(df, table_name="psb_member", rows_per_insert=1,
+                          max_statement_bytes=DEFAULT_MAX_ALLOWED_PACKET, workers=1):
+    """Generate SQL matching psb_member structure
+    
+    Args:
+        df (pd.DataFrame): Parsed data
+        table_name (str): Target table
+        rows_per_insert (int): Rows per INSERT statement. Values above 1
+            emit extended ``INSERT ... VALUES (...),(...)`` statements
+        max_statement_bytes (int): Byte cap per extended INSERT, keep it
+            at or below the server's ``max_allowed_packet``
+        workers (int): Worker processes used to encode row chunks
+    """
+    df, cols, col_types = _resolve_columns(df, table_name)
+    
+    # CREATE TABLE statement
+    create = create_table_sql(table_name, cols, col_types)
+    
+    # INSERT statements
+    inserts = list(_iter_inserts(df, table_name, cols, col_types, rows_per_insert,
+                                 max_statement_bytes, ENCODE_CHUNK_ROWS, workers))
     
     print(f"\n✅ Done! Generated {len(inserts)} INSERT statements\n")
     
@@ -648,4 +1094,43 @@ def save_sql(sql_dict, filename="output.sql"):
         return True
     except Exception as e:
         print(f"❌ Error saving file: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def save_sql_stream(pieces, filename="output.sql", buffer_size=WRITE_BUFFER_SIZE):
+    """Write SQL pieces to file as they are produced
+    
+    Args:
+        pieces (iterable): SQL text pieces, e.g. from iter_sql_advanced
+        filename (str): Output file
+        buffer_size (int): Characters collected before each write
+        
+    Returns:
+        dict or None: {'statements': n, 'bytes': size} on success. On
+        failure the partly written file is removed
+    """
+    opened = False
+    try:
+        count = 0
+        buffer = []
+        buffered = 0
+        with open(filename, 'w', encoding='utf-8') as f:
+            opened = True
+            for piece in pieces:
+                buffer.append(piece)
+                buffered += len(piece)
+                count += 1
+                if buffered >= buffer_size:
+                    f.write(''.join(buffer))
+                    buffer = []
+                    buffered = 0
+            f.write(''.join(buffer))
+        
+        size = os.path.getsize(filename)
+        print(f"✅ SQL saved to: {filename} ({size:,} bytes)")
+        return {'statements': count, 'bytes': size}
+    except Exception as e:
+        print(f"❌ Error saving file: {e}")
+        if opened:
+            os.remove(filename)  # Don't leave a truncated file behind
+        return None
@@ -0,0 +1,62 @@
+"""
+Batch mode: several exports into one database sink, and option checks
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from modules.batch import collect_jobs, run_batch
+
+
+def make_export(names):
+    """Export with No / Nama columns, No counting from 1"""
+    out = ["<table id='mytable'>", "<tr><th>No</th><th>Nama</th></tr>"]
+    out += [f"<tr><td>{i}</td><td>{name}</td></tr>" for i, name in enumerate(names, 1)]
+    return "\n".join(out + ["</table>"])
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = os.path.join(self.tmp.name, 'exports')
+        os.makedirs(self.source)
+        for subdomain, names in (('sma1', ['Ani', "O'Brien"]), ('smp2', ['Budi', 'Cici', 'Dedi'])):
+            with open(os.path.join(self.source, f'{subdomain}.html'), 'w', encoding='utf-8') as f:
+                f.write(make_export(names))
+
+    def test_sink_loads_every_file(self):
+        db = os.path.join(self.tmp.name, 'psb.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_batch(collect_jobs(self.source), self.tmp.name, workers=1, sink=f'sqlite:///{db}')
+        self.assertTrue(all(r['ok'] for r in results), results)
+
+        conn = sqlite3.connect(db)
+        self.addCleanup(conn.close)
+        found = conn.execute('SELECT "no", subdomain, nama FROM psb_member ORDER BY "no"').fetchall()
+        self.assertEqual(found, [(1, 'sma1', 'Ani'), (2, 'sma1', "O'Brien"), (3, 'smp2', 'Budi'),
+                                 (4, 'smp2', 'Cici'), (5, 'smp2', 'Dedi')])
+
+    def test_conflicting_options_are_rejected(self):
+        for extra in (['--sink', 'sqlite://', '--delta'], ['--sink', 'sqlite://', '--fast-import'],
+                      ['--sink', 'sqlite://', '--rows-per-insert', '100'], ['--delta', '--fast-import']):
+            with self.subTest(options=extra):
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as caught:
+                    main.batch_main(['--batch', self.source, '--out-dir', self.tmp.name] + extra)
+                self.assertEqual(caught.exception.code, 2)
+                self.assertIn("can't be combined", stderr.getvalue())
+        with self.assertRaises(ValueError):
+            run_batch([], self.tmp.name, sink='sqlite://', fast_import=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
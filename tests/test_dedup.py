@@ -0,0 +1,53 @@
+"""
+Dedup: duplicate registrants inside one export
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.dedup import dedupe_dataframe
+
+
+def make_df(rows):
+    """Parsed export: No counter, then NIK / Nama / Alamat"""
+    df = pd.DataFrame(rows, columns=['NIK', 'Nama', 'Alamat'])
+    df.insert(0, 'No', [str(i) for i in range(1, len(rows) + 1)])
+    return df
+
+
+def dedupe(df, key, policy='first'):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dedupe_dataframe(df, key, policy)
+
+
+class TestDedup(unittest.TestCase):
+
+    def test_full_row_ignores_the_counter(self):
+        df = make_df([('1', 'Ani', 'Jl. A'), ('2', 'Budi', ''), ('1', 'Ani', 'Jl. A'), ('1', 'Ani', 'Jl. B')])
+        result = dedupe(df, 'row')
+        self.assertEqual(result['No'].tolist(), ['1', '2', '4'])
+        self.assertEqual(result.attrs['dedup']['removed'], [(3, 1, None)])
+
+    def test_key_policies(self):
+        df = make_df([('1', 'Ani', ''), ('2', 'Budi', ''), (' 1', 'Ani', 'Jl. A'), ('', 'Cici', ''),
+                      ('', 'Dedi', '')])
+        for policy, kept in (('first', ['1', '2', '4', '5']), ('last', ['2', '3', '4', '5']),
+                             ('complete', ['2', '3', '4', '5'])):
+            with self.subTest(policy=policy):
+                result = dedupe(df, 'nik', policy)
+                self.assertEqual(result['No'].tolist(), kept)
+                self.assertEqual((result.attrs['dedup']['collapsed'], result.attrs['dedup']['groups']), (1, 1))
+
+    def test_missing_key_column(self):
+        with self.assertRaises(ValueError):
+            dedupe(make_df([('1', 'Ani', '')]), 'nomor_pendaftaran')
+
+
+if __name__ == '__main__':
+    unittest.main()
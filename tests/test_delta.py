@@ -0,0 +1,82 @@
+"""
+Delta import: the SQL of consecutive runs, loaded into one database
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.delta import convert_delta_file
+from modules.dialects import create_table_dialect
+from modules.sql_generator_advance import resolve_columns
+
+
+def make_export(rows):
+    """Export with No / Nomor Pendaftaran / Nama columns"""
+    out = ["<table id='mytable'>", "<tr><th>No</th><th>Nomor Pendaftaran</th><th>Nama</th></tr>"]
+    for i, (number, name) in enumerate(rows, 1):
+        out.append(f"<tr><td>{i}</td><td>{number}</td><td>{name}</td></tr>")
+    out.append("</table>")
+    return "\n".join(out)
+
+
+class TestDeltaRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.index = os.path.join(self.tmp.name, 'export.idx')
+
+    def run_delta(self, rows, **options):
+        html = os.path.join(self.tmp.name, 'export.html')
+        sql = os.path.join(self.tmp.name, 'delta.sql')
+        with open(html, 'w', encoding='utf-8') as f:
+            f.write(make_export(rows))
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = convert_delta_file(html, sql, self.index, subdomain='s', **options)
+        self.assertIsNotNone(stats)
+        with open(sql, encoding='utf-8') as f:
+            return stats, f.read()
+
+    def test_shifted_counter_loads_into_one_table(self):
+        # Day 2: P1 withdrew (every No shifts), P3 changed, P4 is new
+        day1 = [('P1', 'Ani'), ('P2', 'Budi'), ('P3', 'Cici')]
+        day2 = [('P2', 'Budi'), ('P3', 'Cici R'), ('P4', 'Dedi')]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, cols, col_types = resolve_columns(['subdomain', 'No', 'Nomor Pendaftaran', 'Nama'])
+        conn = sqlite3.connect(':memory:')
+        conn.executescript(create_table_dialect('psb_member', cols, col_types, 'sqlite'))
+
+        for rows in (day1, day2):
+            stats, sql = self.run_delta(rows)
+            self.assertNotIn('`no`', sql)
+            conn.executescript(sql)
+
+        self.assertEqual((stats['new'], stats['changed'], stats['removed']), (1, 1, 1))
+        found = conn.execute('SELECT "no", nomor_pendaftaran, nama FROM psb_member ORDER BY "no"').fetchall()
+        self.assertEqual(found, [(1, 'P1', 'Ani'), (2, 'P2', 'Budi'), (3, 'P3', 'Cici R'), (4, 'P4', 'Dedi')])
+
+    def test_upsert_leaves_no_to_the_database(self):
+        self.run_delta([('P1', 'Ani'), ('P2', 'Budi')], mode='upsert')
+        stats, sql = self.run_delta([('P2', 'Budi R')], mode='upsert')
+        self.assertEqual(stats['changed'], 1)
+        self.assertIn("INSERT INTO `psb_member` (`subdomain`, `nomor_pendaftaran`, `nama`) VALUES "
+                      "('s', 'P2', 'Budi R') ON DUPLICATE KEY UPDATE", sql)
+
+    def test_duplicate_key_keeps_first_row(self):
+        rows = [('P1', 'Ani'), ('P1', 'Ani Kedua')]
+        stats, sql = self.run_delta(rows)
+        self.assertEqual((stats['new'], stats['duplicate']), (1, 1))
+        self.assertNotIn('Kedua', sql)
+        stats, sql = self.run_delta(rows)
+        self.assertEqual((stats['unchanged'], stats['changed']), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+SQL dialects: PostgreSQL / SQLite load scripts of several schools
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.dialects import iter_sql_dialect
+
+
+def make_df(subdomain, names):
+    """Parsed export as main.py builds it: subdomain, then the export columns"""
+    df = pd.DataFrame({'No': [str(i) for i in range(1, len(names) + 1)],
+                       'Nomor Pendaftaran': [f"{subdomain}-{i}" for i in range(len(names))],
+                       'Nama': names})
+    df.insert(0, 'subdomain', subdomain)
+    return df
+
+
+def script(df, dialect, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ''.join(iter_sql_dialect(df, dialect, **options))
+
+
+class TestDialectScripts(unittest.TestCase):
+
+    def test_sqlite_loads_two_schools(self):
+        # Both exports count from 1; the table numbers the rows itself
+        conn = sqlite3.connect(':memory:')
+        conn.executescript(script(make_df('sma1', ['Ani', "O'Brien"]), 'sqlite'))
+        conn.executescript(script(make_df('smp2', ['Budi', 'Cici']), 'sqlite', rows_per_insert=1))
+
+        found = conn.execute('SELECT "no", subdomain, nama FROM psb_member ORDER BY "no"').fetchall()
+        self.assertEqual(found, [(1, 'sma1', 'Ani'), (2, 'sma1', "O'Brien"),
+                                 (3, 'smp2', 'Budi'), (4, 'smp2', 'Cici')])
+
+    def test_copy_leaves_no_to_the_sequence(self):
+        sql = script(make_df('sma1', ['Ani', 'Bu\tdi']), 'postgresql')
+        self.assertIn('"no" SERIAL PRIMARY KEY', sql)
+        self.assertIn('COPY "psb_member" ("subdomain", "nomor_pendaftaran", "nama") FROM STDIN;\n'
+                      'sma1\tsma1-0\tAni\nsma1\tsma1-1\tBu\\tdi\n\\.\n', sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Equivalence tests: every fast path must give the same rows as the
+reference path it replaces
+
+- parser backends: export / lxml / streaming == BeautifulSoup
+- parallel parse (workers > 1) == serial parse
+- chunked HTMLRepairer == repair_html on the whole document
+
+Run: python -m pytest -q  (or python -m unittest discover tests)
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import make_export
+from modules import html_parser
+from modules.html_repair import HTMLRepairer, repair_html
+
+
+# Cell texts the backends used to read differently
+TRICKY_CELLS = [
+    'a&ltb', '&copy2023', '&copy;', '&Amp;', '&AMP', '&amp;', '&ampx', 'a&b;c', '&notit;',
+    '&bigstar;', '&#39;', '&#39', '&#x41;', '&#128;', '&#1;', 'AT&T', 'MTs & MA', 'a &amp b',
+    'a\rb', 'x\r\ny', "Dewi O'Brien", '&nbsp;x', '',
+]
+
+
+def make_table(cells, attrs='', close_tr=True):
+    """<table id='mytable'> with one header and one data row per cell"""
+    rows = ["<table id='mytable' border=\"1\">", "<tr><th>No</th><th>Nama</th></tr>"]
+    for i, text in enumerate(cells, 1):
+        rows.append(f"<tr><td>{i}</td><td{attrs}>{text}</td>" + ("</tr>" if close_tr else ""))
+    rows.append("</table>")
+    return "<html><body>\n" + "\n".join(rows) + "\n</body></html>"
+
+
+def quiet(func, *args, **kwargs):
+    """Call func with its progress messages suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def backend_rows(html, backend):
+    name, rows = quiet(html_parser._html_rows, html, backend)
+    return name, list(rows)
+
+
+def stream_rows(html, chunk_size):
+    chunks = [html[i:i + chunk_size] for i in range(0, len(html), chunk_size)]
+    return list(html_parser.iter_table_rows(chunks))
+
+
+class TestBackendEquivalence(unittest.TestCase):
+    """export / lxml / streaming vs BeautifulSoup"""
+
+    def assert_backends_agree(self, html):
+        _, expected = backend_rows(html, 'bs4')
+        for backend in ('auto', 'lxml', 'export'):
+            with self.subTest(backend=backend):
+                self.assertEqual(backend_rows(html, backend)[1], expected)
+        for chunk_size in (1, 7, 64, len(html)):
+            with self.subTest(stream=chunk_size):
+                self.assertEqual(stream_rows(html, chunk_size), expected)
+
+    def test_tricky_cells(self):
+        for text in TRICKY_CELLS:
+            with self.subTest(cell=text):
+                self.assert_backends_agree(make_table([text]))
+
+    def test_missing_closing_tags(self):
+        self.assert_backends_agree(make_table(TRICKY_CELLS, close_tr=False))
+
+    def test_attribute_with_angle_bracket(self):
+        # The export regexes ended the tag at the first '>'
+        for attrs in (' title="a>b"', " title='<td>'", ' title=a"b', ' class="x" data-a=b'):
+            with self.subTest(attrs=attrs):
+                self.assert_backends_agree(make_table(['1', 'dua'], attrs))
+
+    def test_entities_are_case_sensitive(self):
+        _, rows = backend_rows(make_table(['&Amp;']), 'export')
+        self.assertEqual(rows[1], ['1', '&Amp'])
+
+    def test_lxml_declines_what_it_reads_differently(self):
+        for text in ('a&ltb', '&copy2023', 'a\rb', '&notit;', '&#xZ'):
+            with self.subTest(cell=text):
+                self.assertIsNone(html_parser._lxml_rows(make_table([text])))
+
+    def test_synthetic_export(self):
+        self.assert_backends_agree(make_export(12, seed=3))
+
+
+class TestParallelParse(unittest.TestCase):
+    """parse_html_from_file with workers > 1 vs one process"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(html_parser, 'PARALLEL_PARSE_MIN_BYTES', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def assert_parallel_matches(self, path, **options):
+        serial = quiet(html_parser.parse_html_from_file, path, cache=False, **options)
+        parallel = quiet(html_parser.parse_html_from_file, path, cache=False, workers=2, **options)
+        self.assertIsNotNone(serial)
+        self.assertTrue(serial.equals(parallel))
+        self.assertEqual(serial.attrs.get('parser_backend'), parallel.attrs.get('parser_backend'))
+
+    def test_export(self):
+        path = self.write('export.html', make_export(40, seed=1).encode('utf-8'))
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming):
+                self.assert_parallel_matches(path, streaming=streaming)
+
+    def test_mixed_encodings(self):
+        # UTF-8 'Á' (C3 81, invalid in cp1252) in one range, cp1252 '€'
+        # (invalid UTF-8) in another: the serial parse falls to latin-1
+        cells = [f"Nama {i}" for i in range(60)]
+        cells[1] = 'Á'
+        cells[-1] = '€'
+        html = make_table(cells)
+        head, tail = html.split('€')
+        data = head.encode('utf-8') + '€'.encode('cp1252') + tail.encode('utf-8')
+        path = self.write('mixed.html', data)
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming):
+                self.assert_parallel_matches(path, streaming=streaming)
+
+    def test_tricky_cells(self):
+        path = self.write('tricky.html', make_table(TRICKY_CELLS * 3, close_tr=False).encode('utf-8'))
+        self.assert_parallel_matches(path)
+
+    def test_row_tag_inside_attribute(self):
+        # A '<tr' inside an attribute value is no row boundary
+        cells = [f'<span title="<tr>">x{i}</span>' for i in range(40)]
+        cells[7] = "<b title='a>b<tr><td>'>y</b>"
+        path = self.write('attr.html', make_table(cells).encode('utf-8'))
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming):
+                self.assert_parallel_matches(path, streaming=streaming)
+        df = quiet(html_parser.parse_html_from_file, path, cache=False, workers=2)
+        self.assertEqual(df.iloc[5].tolist(), ['6', 'x5'])
+
+
+class TestChunkedRepair(unittest.TestCase):
+    """HTMLRepairer fed in pieces vs repair_html on the whole document"""
+
+    DOCS = [
+        "<table><tr><td title='<tr>'>a<tr><td>b</td></table>",
+        '<table><tr><th a="x>y" b=\'</tr>\'>H<tr><td title="<td>">1<td>2</tr></table>',
+        "<table><tr><td>a<!-- <tr> --><td title='<!--'>b<tr><td>c</table>",
+        "<table><tr><td>x<script>'<tr>'</script><td>O'Brien<tr><td>\"q\"</table>",
+    ]
+
+    def repair_in_pieces(self, html, cuts):
+        repairer = HTMLRepairer()
+        bounds = [0] + list(cuts) + [len(html)]
+        out = [repairer.feed(html[a:b]) for a, b in zip(bounds, bounds[1:])]
+        return ''.join(out) + repairer.close()
+
+    def test_every_split(self):
+        for html in self.DOCS:
+            whole = repair_html(html)
+            for i in range(len(html) + 1):
+                for j in range(i, len(html) + 1):
+                    self.assertEqual(self.repair_in_pieces(html, (i, j)), whole, (html, i, j))
+
+    def test_quoted_tag_is_not_a_row(self):
+        html = self.DOCS[0]
+        cut = html.index("title='<") + len("title='<")
+        self.assertEqual(self.repair_in_pieces(html, (cut,)),
+                         "<table><tr><td title='<tr>'>a</td></tr><tr><td>b</td></tr></table>")
+
+    def test_export_chunks(self):
+        html = make_export(20, seed=2)
+        whole = repair_html(html)
+        for size in (97, 4096):
+            with self.subTest(chunk=size):
+                self.assertEqual(self.repair_in_pieces(html, range(size, len(html), size)), whole)
+
+
+if __name__ == '__main__':
+    unittest.main()
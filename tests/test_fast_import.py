@@ -0,0 +1,48 @@
+"""
+Fast-import mode: session tuning and batched COMMITs around the INSERTs
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.sql_generator_advance import fast_import_sql, iter_sql_advanced
+
+
+def script(df, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ''.join(iter_sql_advanced(df, **options))
+
+
+class TestFastImport(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({'subdomain': ['sma1'] * 25, 'Nama': [f"Nama {i}" for i in range(25)]})
+
+    def test_layout(self):
+        sql = script(self.df, rows_per_insert=4, fast_import=True, commit_rows=10)
+        preamble, postamble = fast_import_sql('psb_member')
+        create, rest = sql.split(preamble)
+        self.assertTrue(create.startswith('CREATE TABLE IF NOT EXISTS `psb_member`'))
+        self.assertTrue(rest.endswith('\n' + postamble))
+
+        # 7 INSERTs of 4, 4, ... 1 rows: a COMMIT after every 12 rows
+        body = rest[:-len(postamble)]
+        self.assertEqual(body.count('INSERT INTO'), 7)
+        self.assertEqual(body.count('\nCOMMIT;\n'), 2)
+        self.assertEqual(body.split('\nCOMMIT;\n')[0].count('INSERT INTO'), 3)
+
+    def test_same_rows_as_plain_script(self):
+        plain = script(self.df, rows_per_insert=4, include_create=False)
+        fast = script(self.df, rows_per_insert=4, include_create=False, fast_import=True, commit_rows=0)
+        preamble, postamble = fast_import_sql('psb_member')
+        self.assertEqual(fast, preamble + '\n' + plain + '\n' + postamble)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Mapped input: non-UTF-8 exports through every file reader
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.batch import convert_file
+from modules.db_sink import sink_html_file
+from modules.delta import convert_delta_file
+from modules.html_source import open_decoded
+from modules.load_data import html_to_load_data
+from modules.sql_generator_advance import save_sql_stream
+
+# '€' is 0x80 in cp1252, an invalid start byte in UTF-8
+EXPORT = ("<html><head><title>Ekspor</title></head><body>\n<table id='mytable'>\n"
+          "<tr><th>No</th><th>Nomor Pendaftaran</th><th>Nama</th></tr>\n"
+          "<tr><td>1</td><td>P1</td><td>Ani €</td></tr>\n"
+          "<tr><td>2</td><td>P2</td><td>Budi</td></tr>\n</table></body></html>")
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class TestDecodedReaders(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.html = self.path('sma1.html')
+        with open(self.html, 'wb') as f:
+            f.write(EXPORT.encode('cp1252'))
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read(self, name):
+        with open(self.path(name), encoding='utf-8') as f:
+            return f.read()
+
+    def test_open_decoded(self):
+        # Small chunks: the bad byte is far from the first one
+        with open_decoded(self.html, 16) as (chunks, encoding):
+            text = ''.join(chunks)
+        self.assertEqual(encoding, 'cp1252')
+        self.assertEqual(text, EXPORT[EXPORT.index('<table'):])
+
+    def test_batch(self):
+        result = quiet(convert_file, ('sma1', self.html), self.tmp.name)
+        self.assertTrue(result['ok'], result['error'])
+        self.assertIn("'Ani €'", self.read('insert_sma1.sql'))
+
+    def test_delta(self):
+        stats = quiet(convert_delta_file, self.html, self.path('delta.sql'), self.path('sma1.idx'),
+                      subdomain='sma1')
+        self.assertEqual(stats['new'], 2)
+        self.assertIn("'Ani €'", self.read('delta.sql'))
+
+    def test_sink(self):
+        conn = sqlite3.connect(':memory:')
+        stats = quiet(sink_html_file, self.html, conn, subdomain='sma1')
+        self.assertEqual(stats['rows'], 2)
+        self.assertEqual(conn.execute('SELECT nama FROM psb_member ORDER BY "no"').fetchall(),
+                         [('Ani €',), ('Budi',)])
+
+    def test_load_data(self):
+        stats = quiet(html_to_load_data, self.html, self.path('psb_member.tsv'), subdomain='sma1')
+        self.assertIsNotNone(stats)
+        self.assertIn('Ani €', self.read('psb_member.tsv'))
+
+    def test_failed_save_leaves_no_file(self):
+        def pieces():
+            yield "INSERT ...;\n"
+            raise ValueError("broken input")
+        self.assertIsNone(quiet(save_sql_stream, pieces(), self.path('out.sql')))
+        self.assertFalse(os.path.exists(self.path('out.sql')))
+
+
+if __name__ == '__main__':
+    unittest.main()
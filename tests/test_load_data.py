@@ -0,0 +1,57 @@
+"""
+LOAD DATA output: data file and script, from HTML and from a DataFrame
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import make_export
+from modules.html_parser import parse_html_table
+from modules.load_data import escape_field, html_to_load_data, load_data_sql, save_load_data
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class TestLoadData(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read(self, name):
+        with open(self.path(name), encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def test_html_matches_dataframe(self):
+        html = make_export(200, seed=6)
+        with open(self.path('export.html'), 'w', encoding='utf-8') as f:
+            f.write(html)
+        df = quiet(parse_html_table, html, cache=False)
+
+        streamed = quiet(html_to_load_data, self.path('export.html'), self.path('a.tsv'), subdomain='sma1')
+        framed = quiet(save_load_data, df, self.path('b.tsv'), subdomain='sma1')
+        self.assertEqual((streamed['rows'], streamed['columns']), (framed['rows'], framed['columns']))
+        self.assertEqual(self.read('a.tsv'), self.read('b.tsv'))
+        self.assertEqual(self.read('a.sql').replace('a.tsv', 'b.tsv'), self.read('b.sql'))
+        self.assertEqual(len(self.read('a.tsv').splitlines()), 200)
+
+    def test_escapes(self):
+        self.assertEqual(escape_field('a\tb\\c\nd\re\0'), 'a\\tb\\\\c\\nd\\re\\0')
+        sql = load_data_sql('psb_member', ['subdomain', 'nama'], "C:\\data\\o'neil.tsv", local=False)
+        self.assertTrue(sql.startswith("LOAD DATA INFILE 'C:\\\\data\\\\o\\'neil.tsv'\n"))
+        self.assertTrue(sql.endswith("(`subdomain`, `nama`);\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
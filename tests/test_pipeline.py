@@ -0,0 +1,58 @@
+"""
+Fused pipeline: iter_html_sql == parse_html_table → iter_sql_advanced
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import make_export
+from modules.html_parser import parse_html_table
+from modules.pipeline import iter_html_sql
+from modules.sql_generator_advance import iter_sql_advanced, select_valid_columns
+
+# A table nested in a cell: the streaming parser and the tree backends
+# read it differently, the fused path must follow the one it was given
+NESTED = ("<table id='mytable'><tr><th>No</th><th>Nama</th><th>Alamat</th></tr>"
+          "<tr><td>1</td><td>Ani<table><tr><td>x</td></tr></table></td><td>Jl. Mawar</td></tr>"
+          "<tr><td>2</td><td>Budi</td><td>Jl. Melati</td></tr></table>")
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def dataframe_sql(html, streaming=False, **options):
+    df = quiet(parse_html_table, html, streaming=streaming, columns=select_valid_columns, cache=False)
+    df.insert(0, 'subdomain', 'sekolah123')
+    return ''.join(quiet(lambda: list(iter_sql_advanced(df, **options))))
+
+
+def fused_sql(html, **options):
+    chunks = [html[i:i + 1000] for i in range(0, len(html), 1000)]
+    return ''.join(quiet(lambda: list(iter_html_sql(chunks, subdomain='sekolah123', **options))))
+
+
+class TestFusedPipeline(unittest.TestCase):
+
+    def test_export(self):
+        html = make_export(300, seed=4)
+        for options in ({}, {'rows_per_insert': 50}, {'fast_import': True}):
+            with self.subTest(**options):
+                self.assertEqual(fused_sql(html, **options), dataframe_sql(html, **options))
+
+    def test_streaming(self):
+        html = make_export(40, seed=5)
+        self.assertEqual(fused_sql(html, streaming=True), dataframe_sql(html, streaming=True))
+
+    def test_nested_table(self):
+        self.assertEqual(fused_sql(NESTED), dataframe_sql(NESTED))
+        self.assertEqual(fused_sql(NESTED, streaming=True), dataframe_sql(NESTED, streaming=True))
+
+
+if __name__ == '__main__':
+    unittest.main()